@@ -1,9 +1,31 @@
 """Surgeo is a Bayesian Improved Geocoding Surname Analysis module."""
 
-from  surgeo.models.bifsg_model import BIFSGModel
-from surgeo.models.first_name_model import FirstNameModel
-from surgeo.models.geocode_model import GeocodeModel
-from surgeo.models.surname_model import SurnameModel
-from surgeo.models.surgeo_model import SurgeoModel
+import importlib
 
 VERSION = '1.1.2'
+
+# The models (and pandas) are imported on first access so that light
+# entry points such as the daemon client start quickly.
+_MODEL_MODULES = {
+    'BIFSGModel': 'surgeo.models.bifsg_model',
+    'FirstNameModel': 'surgeo.models.first_name_model',
+    'GeocodeModel': 'surgeo.models.geocode_model',
+    'SurnameModel': 'surgeo.models.surname_model',
+    'SurgeoModel': 'surgeo.models.surgeo_model',
+}
+
+__all__ = [*_MODEL_MODULES, 'VERSION']
+
+
+def __getattr__(name):
+    if name not in _MODEL_MODULES and name != 'models':
+        raise AttributeError(f'module "surgeo" has no attribute "{name}"')
+    # Import every model at once, as an eager import of the package would
+    for class_name, module_name in _MODEL_MODULES.items():
+        module = importlib.import_module(module_name)
+        globals()[class_name] = getattr(module, class_name)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
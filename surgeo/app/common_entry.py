@@ -1,22 +1,24 @@
 """Module containing the common entry class."""
 
-import pathlib
+import multiprocessing
 import sys
 
-import surgeo
-
-from surgeo.app.surgeo_cli import SurgeoCLI
-from surgeo.app.surgeo_gui import SurgeoGUI
+from surgeo.app.daemon_client import run_in_daemon
 
 
 class SurgeoCommonEntry(object):
-    """An entry point for both the GUI and CLI Surgeo applications
+    """An entry point for the GUI, CLI, server, and daemon applications
 
     This class simply gets the number of args sent to the entry point. If
-    there is a single argument, the GUI is run. If addtional arguments are
-    supplied, the CLI is run. The CLI will then parse the arguments as
-    nothing it is not necessary to pass the arguments from the common entry
-    to the CLI.
+    there is a single argument, the GUI is run. If the first additional
+    argument is "serve" or "daemon", the HTTP service or the CLI daemon is
+    run with the rest. Otherwise the job is handed to a running daemon or,
+    if there is none, the CLI is run. The CLI will then parse the arguments
+    as nothing it is not necessary to pass the arguments from the common
+    entry to the CLI.
+
+    The applications are imported only once chosen, so a job handed to the
+    daemon never imports pandas.
 
     """
 
@@ -24,22 +26,45 @@ class SurgeoCommonEntry(object):
         """The entry point's main function
 
         This gets the number of arguments supplied. If no arguments are
-        supplied in addition to the 'surgeo' command, the GUI is run.
-        Otherwise, the CLI is run.
+        supplied in addition to the 'surgeo' command, the GUI is run. If
+        the first argument is 'serve', the HTTP service is run, and if it
+        is 'daemon', the CLI daemon is run. Otherwise, the job is sent to
+        the daemon, falling back to the CLI.
 
         """
 
+        # A frozen executable must not rerun the entry point in pool workers
+        multiprocessing.freeze_support()
         # Get arg count
         arg_count = len(sys.argv)
         # If 1, run GUI.
         if arg_count == 1:
+            from surgeo.app.surgeo_gui import SurgeoGUI
             gui = SurgeoGUI()
             gui.main()
-        # Else, run CLI
-        else:
+        # If 'serve', run the HTTP service
+        elif sys.argv[1] == 'serve':
+            from surgeo.app.surgeo_server import SurgeoServer
+            server = SurgeoServer(sys.argv[2:])
+            server.main()
+        # If 'daemon', run the CLI daemon
+        elif sys.argv[1] == 'daemon':
+            from surgeo.app.surgeo_daemon import SurgeoDaemon
+            daemon = SurgeoDaemon(sys.argv[2:])
+            daemon.main()
+        # Else, hand the job to a daemon or run the CLI
+        elif not self._ran_in_daemon(sys.argv[1:]):
+            from surgeo.app.surgeo_cli import SurgeoCLI
             cli = SurgeoCLI()
             cli.main()
 
+    def _ran_in_daemon(self, argv):
+        """Try a running daemon unless the CLI itself must answer"""
+        # Help and stdin/stdout streams belong to this process
+        if {'-h', '--help', '--no_daemon', '-'} & set(argv):
+            return False
+        return run_in_daemon(argv)
+
 
 if __name__ == '__main__':
     common = SurgeoCommonEntry()
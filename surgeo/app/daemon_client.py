@@ -0,0 +1,110 @@
+"""Module handing CLI jobs to a running Surgeo daemon.
+
+This module only uses the standard library so that a CLI call handed to the
+daemon never has to import pandas or load a reference table.
+"""
+
+import json
+import os
+import pathlib
+import socket
+import stat
+import tempfile
+
+from surgeo.utility.surgeo_exception import SurgeoException
+
+
+def get_socket_path() -> pathlib.Path:
+    """Get the daemon's Unix socket path
+
+    This is $SURGEO_SOCKET if it is set. Otherwise it is surgeo.sock in
+    $XDG_RUNTIME_DIR or, without one, daemon.sock in a per-user directory
+    (only accessible to that user) in the temporary directory.
+
+    Returns
+    -------
+    pathlib.Path
+        The path the daemon listens on and the CLI connects to
+
+    """
+    socket_path = os.environ.get('SURGEO_SOCKET')
+    if socket_path:
+        return pathlib.Path(socket_path)
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return pathlib.Path(runtime_dir) / 'surgeo.sock'
+    user_id = os.getuid() if hasattr(os, 'getuid') else 0
+    socket_dir = pathlib.Path(tempfile.gettempdir()) / f'surgeo-{user_id}'
+    return socket_dir / 'daemon.sock'
+
+
+def is_own_socket(path) -> bool:
+    """Check whether a path is a Unix socket owned by the current user
+
+    Anyone can create files in a shared directory such as /tmp, so a socket
+    there is only trusted with job arguments if this user created it.
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The socket path to check (symbolic links are not followed)
+
+    Returns
+    -------
+    bool
+        True if the path is a socket owned by the current user
+
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def run_in_daemon(argv: list, cwd=None) -> bool:
+    """Run a CLI job in the daemon if one is listening
+
+    Parameters
+    ----------
+    argv : list
+        The CLI arguments (without the program name)
+    cwd : str
+        The directory relative paths are resolved from (default: the
+        current working directory)
+
+    Returns
+    -------
+    bool
+        True if the daemon ran the job; False if no daemon owned by this
+        user is listening or the daemon could not parse the arguments, in
+        which case the job should be run in-process
+
+    Raises
+    ------
+    surgeo.utility.SurgeoException
+        Raised with the daemon's error message if the job failed
+
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return False
+    socket_path = get_socket_path()
+    # Never send a job to a socket another user could have put there
+    if not is_own_socket(socket_path):
+        return False
+    request = {'argv': list(argv), 'cwd': str(cwd or os.getcwd())}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(socket_path))
+        except OSError:
+            return False
+        client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with client.makefile('rb') as reply_file:
+            reply_line = reply_file.readline()
+    # A daemon that stopped mid-job (or an empty reply) means run it here
+    if not reply_line:
+        return False
+    reply = json.loads(reply_line)
+    if 'error' in reply:
+        raise SurgeoException(reply['error'])
+    return reply.get('status') == 'ok'
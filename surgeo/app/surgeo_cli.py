@@ -1,14 +1,36 @@
 """Script containing a basic command line program."""
 
 import argparse
+import collections
+import concurrent.futures
+import io
+import json
+import math
+import multiprocessing
 import pathlib
+import queue
 import sys
+import threading
+import time
 import traceback
 
 import pandas as pd
 
 import surgeo
 
+from surgeo.app.daemon_client import run_in_daemon
+from surgeo.utility.columnar_io import ColumnarWriter
+from surgeo.utility.columnar_io import is_columnar
+from surgeo.utility.columnar_io import iter_columnar
+from surgeo.utility.columnar_io import read_columnar
+from surgeo.utility.columnar_io import write_columnar
+from surgeo.utility.csv_io import CSVWriter
+from surgeo.utility.csv_io import is_csv
+from surgeo.utility.csv_io import write_csv
+from surgeo.utility.excel_io import ExcelWriter
+from surgeo.utility.excel_io import iter_excel
+from surgeo.utility.excel_io import read_excel
+from surgeo.utility.excel_io import write_excel
 from surgeo.utility.surgeo_exception import SurgeoException
 from surgeo.models.bifsg_model import BIFSGModel
 from surgeo.models.first_name_model import FirstNameModel
@@ -39,12 +61,19 @@ class SurgeoCLI(object):
                           [--state_column STATE_COLUMN]
                           [--county_column COUNTY_COLUMN]
                           [--tract_column TRACT_COLUMN]
+                          [--chunksize CHUNKSIZE]
+                          [--workers WORKERS]
+                          [--no_daemon] [--format {csv,ndjson}]
+                          [--max_latency_ms MAX_LATENCY_MS]
+                          [--keep_columns KEEP_COLUMNS]
+                          [--precision PRECISION]
+                          [--compact] [--margin]
                           input output type
 
             Get Surgeo arguments.
 
-            input                 Input CSV or XLSX of data.
-            output                Output CSV or XLSX of data.
+            input                 Input CSV (optionally .gz/.bz2/.xz), XLSX, Parquet, Feather, or Arrow data (or - for stdin).
+            output                Output CSV (optionally .gz/.bz2/.xz), XLSX, Parquet, Feather, or Arrow data (or - for stdout).
             type                  The model type being run ("first", "sur", "geo", "bifsg", or "surgeo")
 
             optional arguments:
@@ -59,12 +88,28 @@ class SurgeoCLI(object):
             --state_column STATE_COLUMN input column containing two digit FIPS state code
             --county_column input column containing three digit FIPS County Code
             --tract_column input column containing six digit tract code
+            --chunksize CHUNKSIZE
+                                Stream a CSV through the model this many rows at a time
+            --workers WORKERS   Score chunks in this many processes (output order is kept)
+            --no_daemon         Run here even if a "surgeo daemon" is running
+            --format {csv,ndjson}
+                                The record format of stdin and stdout (default csv)
+            --max_latency_ms MAX_LATENCY_MS
+                                Longest a stdin record waits for its batch (default 100)
+            --keep_columns KEEP_COLUMNS
+                                Comma separated input columns to copy to the output
+            --precision PRECISION
+                                Round output probabilities to this many decimal places
+            --compact           Output only the most likely race and its probability (surgeo and bifsg)
+            --margin            Also output the lead over the second most likely race (implies --compact)
 
     """
 
-    def __init__(self):
+    def __init__(self, argv=None):
+        # Keep the raw arguments to hand to a daemon
+        self._argv = sys.argv[1:] if argv is None else list(argv)
         # Parse args
-        args = self._get_parsed_args()
+        args = self._get_parsed_args(self._argv)
         # Add those arguments as members
         self._input_path = pathlib.Path(args.input)
         self._output_path = pathlib.Path(args.output)
@@ -76,9 +121,35 @@ class SurgeoCLI(object):
         self._county_col = args.county_column
         self._tract_col = args.tract_column
         self._ct = args.ct
+        self._chunksize = args.chunksize
+        self._workers = args.workers
+        self._no_daemon = args.no_daemon
+        self._format = args.format
+        # Input columns copied to the output as-is
+        self._keep_cols = []
+        if args.keep_columns:
+            self._keep_cols = args.keep_columns.split(',')
+        self._max_latency_ms = args.max_latency_ms
+        self._precision = args.precision
+        # Compact output keeps the most likely race (and optionally margin)
+        self._model_kwargs = {
+            'compact': args.compact or args.margin,
+            'margin': args.margin,
+        }
+        if self._model_kwargs['compact'] and self._model_type not in (
+                'surgeo', 'bifsg'):
+            raise SurgeoException(
+                '--compact and --margin only apply to the "surgeo" and '
+                '"bifsg" models.'
+            )
+        # "-" reads records from stdin or writes them to stdout
+        self._stream_input = args.input == '-'
+        self._stream_output = args.output == '-'
         self._zcta_col_default = 'zcta5'
         self._first_col_default = 'first_name'
         self._sur_col_default = 'name'
+        # Models are built once and reused for every chunk
+        self._models = {}
 
     def main(self):
         """This is the public interface function for this CLI.
@@ -96,6 +167,22 @@ class SurgeoCLI(object):
         6. Writes the resulting data to a new CSV based to output path
            specified by user.
 
+        If a chunksize is given, steps 2 through 6 are run on one chunk of
+        the input CSV at a time and each result is appended to the output
+        CSV, so memory use depends on the chunk size, not the file size.
+        If more than one worker is requested, the chunks (or slices of the
+        whole input) are scored in a process pool and written in order.
+
+        If the input is "-", CSV or NDJSON records are read from stdin and
+        scored in batches of up to chunksize records (default 1000), each
+        batch waiting at most max_latency_ms for its records. If the output
+        is "-", each scored batch is written to stdout as soon as it is
+        ready. Either way memory use is bounded, so the CLI can be used as a
+        filter in a pipeline.
+
+        If a "surgeo daemon" is running (and --no_daemon is not passed), the
+        job is handed to it instead, so the models are already loaded.
+
         Raises
         ------
         surgeo.utility.SurgeoException
@@ -104,40 +191,293 @@ class SurgeoCLI(object):
             inappropriate outputs are not specified.
 
         """
-        input_df = self._load_df()
-        processed_df = self._process_df(input_df)
-        self._write_df(processed_df)
+        streaming = self._stream_input or self._stream_output
+        # The daemon cannot see this process's stdin or stdout
+        if not (streaming or self._no_daemon) and run_in_daemon(self._argv):
+            return
+        if self._workers < 1:
+            raise SurgeoException('--workers must be a positive integer.')
+        if streaming:
+            if self._stream_input:
+                input_dfs = self._load_stream()
+            elif self._chunksize is not None:
+                input_dfs = self._load_chunks()
+            else:
+                input_dfs = [self._load_df()]
+            processed_dfs = self._process_dfs(input_dfs)
+            if self._stream_output:
+                self._write_stream(processed_dfs)
+            else:
+                self._write_chunks(processed_dfs)
+        elif self._chunksize is not None:
+            input_dfs = self._load_chunks()
+            processed_dfs = self._process_dfs(input_dfs)
+            self._write_chunks(processed_dfs)
+        elif self._workers > 1:
+            input_df = self._load_df()
+            processed_dfs = self._process_dfs(self._split_df(input_df))
+            processed_df = pd.concat(processed_dfs, ignore_index=True)
+            self._write_df(processed_df)
+        else:
+            input_df = self._load_df()
+            processed_df = self._process_df(input_df)
+            self._write_df(processed_df)
 
     def _load_df(self):
-        """This creates a dataframe based on self._input_path"""
+        """This creates a dataframe based on self._input_path
+
+        Only the columns the model uses (plus any --keep_columns) are read,
+        and text formats are read as strings without dtype inference.
+        """
+        suffix = self._input_path.suffix
+        columns = self._get_read_columns()
+        try:
+            # If it's excel, stream it with openpyxl's read-only mode
+            if suffix == '.xlsx' or suffix == 'xls':
+                df = read_excel(self._input_path, columns)
+            # If CSV, read read_csv() (which undoes any compression)
+            elif is_csv(self._input_path):
+                df = pd.read_csv(
+                    self._input_path,
+                    skip_blank_lines=False,
+                    usecols=columns,
+                    dtype=str,
+                )
+            # If columnar, read_columnar()
+            elif is_columnar(self._input_path):
+                df = read_columnar(self._input_path, columns)
+            # If path is unrecognized, throw error
+            else:
+                raise SurgeoException(
+                    f'File ending for "{self._input_path}" not recognized. '
+                    'Please use .csv (optionally .gz, .bz2, or .xz), .xlsx, '
+                    '.parquet, .feather, or .arrow.'
+                )
+        # Missing columns are reported as ValueErrors
+        except ValueError as e:
+            raise SurgeoException(f'Cannot read "{self._input_path}": {e}')
+        return df
+
+    def _load_chunks(self):
+        """This reads self._input_path as dataframes of self._chunksize rows"""
         suffix = self._input_path.suffix
-        # If it's excel, read_excel()
-        if suffix == '.xlsx' or suffix == 'xls':
-            # xlrd doesn't support xlsx as of 2021-01-23
-            df = pd.read_excel(self._input_path, engine='openpyxl')
-        # If CSV, read read_csv()
-        elif suffix == '.csv':
-            df = pd.read_csv(
+        # Only CSV, Excel, and columnar files can be read incrementally
+        if not (suffix == '.xlsx'
+                or is_csv(self._input_path)
+                or is_columnar(self._input_path)):
+            raise SurgeoException(
+                f'"{self._input_path}" cannot be read in chunks. Please use '
+                'a .csv, .xlsx, .parquet, .feather, or .arrow input with '
+                '--chunksize.'
+            )
+        if self._chunksize < 1:
+            raise SurgeoException('--chunksize must be a positive integer.')
+        columns = self._get_read_columns()
+        try:
+            # Columnar files are read a row group (or record batch) at a time
+            if is_columnar(self._input_path):
+                return iter_columnar(
+                    self._input_path,
+                    self._chunksize,
+                    columns,
+                )
+            # Workbooks are read row by row in openpyxl's read-only mode
+            if suffix == '.xlsx':
+                return iter_excel(self._input_path, self._chunksize, columns)
+            # Read text as-is so no chunk infers different dtypes
+            reader = pd.read_csv(
                 self._input_path,
                 skip_blank_lines=False,
+                chunksize=self._chunksize,
+                usecols=columns,
+                dtype=str,
             )
-        # If path is unrecognized, throw error
-        else:
-            raise SurgeoException(
-                f'File ending for "{self._input_path}" not '
-                'recognized. Please use .csv or .xlsx.'
+        # Missing columns are reported as ValueErrors
+        except ValueError as e:
+            raise SurgeoException(f'Cannot read "{self._input_path}": {e}')
+        # Number each chunk from zero like a whole-file read
+        return (df.reset_index(drop=True) for df in reader)
+
+    def _load_stream(self):
+        """This reads stdin as dataframes of at most self._chunksize records"""
+        if self._chunksize is not None and self._chunksize < 1:
+            raise SurgeoException('--chunksize must be a positive integer.')
+        if self._max_latency_ms < 0:
+            raise SurgeoException('--max_latency_ms cannot be negative.')
+        if self._format == 'csv':
+            # The header applies to every batch
+            header = sys.stdin.readline()
+            if not header:
+                return
+        columns = self._get_read_columns()
+        # NDJSON lines read so far, to number the line in error messages
+        line_count = 0
+        batch_count = 0
+        for lines in self._read_batches(sys.stdin):
+            if self._format == 'csv':
+                df = self._read_stream_csv(header, lines, columns)
+            else:
+                records = []
+                for line_number, line in enumerate(lines, line_count + 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        raise SurgeoException(
+                            f'Cannot read stdin line {line_number}: {e}'
+                        )
+                line_count += len(lines)
+                if not records:
+                    continue
+                df = pd.DataFrame(records, dtype=object)
+                # Records may leave out keys whose values are missing
+                if columns is not None:
+                    df = df.reindex(columns=columns)
+            batch_count += 1
+            yield df
+        # A header without records still gives the output its header
+        if self._format == 'csv' and not batch_count:
+            yield self._read_stream_csv(header, [], columns)
+
+    def _read_stream_csv(self, header, lines, columns):
+        """Parse a batch of stdin CSV lines under the stream's header"""
+        # Read text as-is so no batch infers different dtypes
+        try:
+            return pd.read_csv(
+                io.StringIO(header + ''.join(lines)),
+                skip_blank_lines=False,
+                usecols=columns,
+                dtype=str,
             )
-        return df
+        except ValueError as e:
+            raise SurgeoException(f'Cannot read stdin: {e}')
+
+    def _read_batches(self, lines):
+        """Group lines into batches by size or by the latency deadline"""
+        batch_size = self._chunksize or 1000
+        # Lines are read in a thread so a quiet producer can't hold a batch
+        line_queue = queue.Queue(maxsize=batch_size * 2)
+        reader = threading.Thread(
+            target=_queue_lines,
+            args=(lines, line_queue),
+            daemon=True,
+        )
+        reader.start()
+        while True:
+            line = line_queue.get()
+            if line is None:
+                return
+            batch = [line]
+            deadline = time.monotonic() + self._max_latency_ms / 1000
+            while len(batch) < batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        line = line_queue.get(timeout=timeout)
+                    else:
+                        line = line_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    yield batch
+                    return
+                batch.append(line)
+            yield batch
+
+    def _split_df(self, df):
+        """Slice a whole dataframe into pieces for the worker processes"""
+        # A few pieces per worker evens out slow and fast slices
+        piece_size = max(math.ceil(len(df) / (self._workers * 4)), 1)
+        for start in range(0, max(len(df), 1), piece_size):
+            yield df.iloc[start:start + piece_size].reset_index(drop=True)
+
+    def _process_dfs(self, dfs):
+        """Score an iterable of dataframes, yielding results in input order"""
+        dfs = iter(dfs)
+        # Score the first one here. Besides surfacing argument errors early,
+        # this loads the model's tables before the pool is forked so the
+        # workers share them copy-on-write instead of loading their own.
+        first_df = next(dfs, None)
+        if first_df is None:
+            return
+        yield self._process_df(first_df)
+        if self._workers == 1:
+            yield from map(self._process_df, dfs)
+            return
+        # Fork where possible so the workers inherit the loaded tables
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = None
+        # Workers get only the arguments, which are cheap to send to a
+        # spawned (e.g. Windows) process, and build their own CLI from them
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._argv,),
+        )
+        with executor:
+            # Bound how far reading gets ahead of writing
+            pending = collections.deque()
+            for df in dfs:
+                pending.append(executor.submit(_process_in_worker, df))
+                if len(pending) >= self._workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _get_model(self, model_class, *args, **kwargs):
+        """Build a model on first request and reuse it afterwards"""
+        key = (model_class, *args, *sorted(kwargs.items()))
+        if key not in self._models:
+            self._models[key] = model_class(*args, **kwargs)
+        return self._models[key]
+
+    def _get_input_columns(self):
+        """List the input columns the chosen model reads (None if unknown)"""
+        first_col = self._first_col or self._first_col_default
+        sur_col = self._sur_col or self._sur_col_default
+        zcta_col = self._zcta_col or self._zcta_col_default
+        tract_cols = [
+            self._state_col or 'state',
+            self._county_col or 'county',
+            self._tract_col or 'tract',
+        ]
+        if self._model_type == 'first':
+            return [first_col]
+        elif self._model_type == 'sur':
+            return [sur_col]
+        elif self._model_type == 'geo':
+            if self._ct and self._zcta_col is None:
+                return tract_cols
+            return [zcta_col]
+        elif self._model_type == 'surgeo':
+            if self._ct:
+                return [sur_col, *tract_cols]
+            return [sur_col, zcta_col]
+        elif self._model_type == 'bifsg':
+            return [first_col, sur_col, zcta_col]
+        # Read everything and let the dispatch report the bad type
+        return None
+
+    def _get_read_columns(self):
+        """List the model's input columns and --keep_columns (None if all)"""
+        columns = self._get_input_columns()
+        if columns is None:
+            return None
+        return list(dict.fromkeys([*columns, *self._keep_cols]))
 
     def _run_geo(self, df):
         """Method called from self._process_df() to get geo results"""
         if self._ct:
-            model = GeocodeModel("TRACT")
+            model = self._get_model(GeocodeModel, "TRACT")
         else:
-            model = GeocodeModel("ZCTA")
+            model = self._get_model(GeocodeModel, "ZCTA")
         # If an optional name is specified, select that column and run
         if self._zcta_col is not None and not self._ct:
-            model = GeocodeModel()
+            model = self._get_model(GeocodeModel, "ZCTA")
         # TODO: if they supply a name not found in CSV ... more specific error?
         # If an optional name is specified, select that column and run
         if self._zcta_col is not None:
@@ -164,7 +504,7 @@ class SurgeoCLI(object):
     def _run_sur(self, df):
         """This runs a surname model for a given dataframe"""
         # Instantiate model
-        model = SurnameModel()
+        model = self._get_model(SurnameModel)
         # If target is specified, get probabilities based on that target
         # TODO: if they supply a name not found in CSV ... more specific error?
         if self._sur_col is not None:
@@ -183,7 +523,7 @@ class SurgeoCLI(object):
     def _run_first(self, df):
         """This runs a first name model for a given dataframe"""
         # Instantiate model
-        model = FirstNameModel()
+        model = self._get_model(FirstNameModel)
         # If target is specified, get probabilities based on that 
         # TODO: if they supply a name not found in CSV ... more specific error?
         if self._first_col is not None:
@@ -206,22 +546,26 @@ class SurgeoCLI(object):
         if self._zcta_col is not None and not self._ct:
             try:
                 geo_target = df[self._zcta_col]
-                model = SurgeoModel()
+                model = self._get_model(SurgeoModel, **self._model_kwargs)
             except KeyError:
                 raise SurgeoException(f'Column "{self._zcta_col}"" not found.')
         elif self._ct and self._state_col is not None:
             try:
                 geo_target = df[[self._state_col, self._county_col, self._tract_col]]
-                model = SurgeoModel(geo_level='TRACT')
+                model = self._get_model(
+                    SurgeoModel,
+                    'TRACT',
+                    **self._model_kwargs,
+                )
             except KeyError:
                 raise SurgeoException(f'Columns for state, county, and tract not found.')
         elif self._ct:
             geo_target = df[['state','county','tract']]
-            model = SurgeoModel(geo_level='TRACT')
+            model = self._get_model(SurgeoModel, 'TRACT', **self._model_kwargs)
         # Otherwise use zcta5 for ZIP target
         else:
             geo_target = df[self._zcta_col_default]
-            model = SurgeoModel()
+            model = self._get_model(SurgeoModel, **self._model_kwargs)
         # If Surname target spcified, check for accuracy
         if self._sur_col is not None:
             sur_target = df[self._sur_col]
@@ -239,7 +583,7 @@ class SurgeoCLI(object):
     def _run_bifsg(self, df):
         """Runs a BIFSG model for a given dataframe"""
         # Instantiate model
-        model = BIFSGModel()
+        model = self._get_model(BIFSGModel, **self._model_kwargs)
         # If ZIP target is specified, check accuracy
         if self._zcta_col is not None:
             try:
@@ -294,37 +638,99 @@ class SurgeoCLI(object):
                 f'Please use one of {type_map.keys()}.'
             )
         result_df = process_func(df)
+        # Shorter numbers make text output smaller and faster to write
+        if self._precision is not None:
+            result_df = result_df.round(self._precision)
+        # Copy any requested input columns in front of the results
+        if self._keep_cols:
+            overlap = set(self._keep_cols) & set(result_df.columns)
+            if overlap:
+                raise SurgeoException(
+                    f'--keep_columns {sorted(overlap)} would duplicate '
+                    'output columns.'
+                )
+            kept_df = df[self._keep_cols].reset_index(drop=True)
+            result_df = pd.concat([kept_df, result_df], axis=1)
         return result_df
 
     def _write_df(self, df):
         """Write to CSV or XLSX depending on file suffix"""
         suffix = self._output_path.suffix
-        # If excel, write to Excel
+        # If excel, write to Excel (splitting rows across sheets as needed)
         if suffix == '.xlsx':
-            df.to_excel(self._output_path, index=False)
-        # If CSV write to CSV
-        elif suffix == '.csv':
-            df.to_csv(self._output_path, index=False)
+            write_excel(self._output_path, df)
+        # If CSV write to CSV (compressing it based on its ending)
+        elif is_csv(self._output_path):
+            write_csv(self._output_path, df)
+        # If columnar, keep the probabilities typed
+        elif is_columnar(self._output_path):
+            write_columnar(self._output_path, df)
         # Otherwise throw error.
         else:
             raise SurgeoException(
-                f'"{self._output_path}" is not a valid. '
-                f'Please specify a path ending in ".csv" or ".xlsx".'
+                f'"{self._output_path}" is not a valid. Please specify a '
+                f'path ending in ".csv", ".csv.gz", ".csv.bz2", ".csv.xz", '
+                f'".xlsx", ".parquet", ".feather", or ".arrow".'
             )
 
-    def _get_parsed_args(self):
+    def _write_chunks(self, dfs):
+        """Append each dataframe to the output file as it arrives"""
+        # Columnar files get one row group (or record batch) per dataframe
+        if is_columnar(self._output_path):
+            with ColumnarWriter(self._output_path) as writer:
+                for df in dfs:
+                    writer.write(df)
+            return
+        # Workbooks are written row by row in openpyxl's write-only mode
+        if self._output_path.suffix == '.xlsx':
+            with ExcelWriter(self._output_path) as writer:
+                for df in dfs:
+                    writer.write(df)
+            return
+        # Otherwise only CSV files can be written incrementally
+        if not is_csv(self._output_path):
+            raise SurgeoException(
+                f'"{self._output_path}" cannot be written in chunks. Please '
+                'use a .csv, .xlsx, .parquet, .feather, or .arrow output '
+                'with --chunksize.'
+            )
+        # Text is buffered (and compressed) as it is written
+        with CSVWriter(self._output_path) as writer:
+            for df in dfs:
+                writer.write(df)
+
+    def _write_stream(self, dfs):
+        """Write each dataframe to stdout as soon as it is scored"""
+        for chunk_number, df in enumerate(dfs):
+            if self._format == 'csv':
+                # Write the header with the first batch only
+                df.to_csv(sys.stdout, index=False, header=chunk_number == 0)
+            else:
+                # Missing values become null in the JSON
+                records = df.astype(object).where(df.notna(), None)
+                for record in records.to_dict(orient='records'):
+                    sys.stdout.write(json.dumps(record) + '\n')
+            sys.stdout.flush()
+
+    def _get_parsed_args(self, argv):
         """Create an argument parser and parse CLI arguments"""
         # Create parser
         parser = argparse.ArgumentParser(description='Get Surgeo arguments.')
         # Add input file path argument
         parser.add_argument(
             'input',
-            help='Input CSV or XLSX of data.',
+            help=(
+                'Input CSV (optionally .gz/.bz2/.xz), XLSX, Parquet, Feather, '
+                'or Arrow data (or - for stdin).'
+            ),
         )
         # Output file path argument
         parser.add_argument(
             'output',
-            help='Output CSV or XLSX of data.',
+            help=(
+                'Output CSV (optionally .gz/.bz2/.xz), XLSX, Parquet, Feather, '
+                'or Arrow data (or - for stdout).'
+            ),
         )
         # Model type argument
         parser.add_argument(
@@ -368,12 +774,109 @@ class SurgeoCLI(object):
             help='The input column to analyze as first name',
             dest='first_name_column'
         )
+        # Optional chunk size for streaming large CSVs
+        parser.add_argument(
+            '--chunksize',
+            help='Stream a CSV through the model this many rows at a time',
+            dest='chunksize',
+            type=int,
+        )
+        # Optional number of worker processes
+        parser.add_argument(
+            '--workers',
+            help='Score chunks in this many processes (output order is kept)',
+            dest='workers',
+            type=int,
+            default=1,
+        )
+        # Optional opt out of a running daemon
+        parser.add_argument(
+            '--no_daemon',
+            help='Run here even if a "surgeo daemon" is running',
+            dest='no_daemon',
+            action='store_true',
+            default=False,
+        )
+        # Optional input columns to copy to the output
+        parser.add_argument(
+            '--keep_columns',
+            help='Comma separated input columns to copy to the output',
+            dest='keep_columns',
+        )
+        # Optional record format of stdin and stdout
+        parser.add_argument(
+            '--format',
+            help='The record format of stdin and stdout (default csv)',
+            dest='format',
+            choices=['csv', 'ndjson'],
+            default='csv',
+        )
+        # Optional latency bound for records read from stdin
+        parser.add_argument(
+            '--max_latency_ms',
+            help='Longest a stdin record waits for its batch (default 100)',
+            dest='max_latency_ms',
+            type=float,
+            default=100.0,
+        )
+        # Optional rounding of the output probabilities
+        parser.add_argument(
+            '--precision',
+            help='Round output probabilities to this many decimal places',
+            dest='precision',
+            type=int,
+        )
+        # Optional compact output of the most likely race
+        parser.add_argument(
+            '--compact',
+            help=(
+                'Output only the most likely race and its probability '
+                '(surgeo and bifsg)'
+            ),
+            dest='compact',
+            action='store_true',
+            default=False,
+        )
+        parser.add_argument(
+            '--margin',
+            help=(
+                'Also output the lead over the second most likely race '
+                '(implies --compact)'
+            ),
+            dest='margin',
+            action='store_true',
+            default=False,
+        )
         # Parse args and return
-        parsed_args = parser.parse_args()
+        parsed_args = parser.parse_args(argv)
         return parsed_args
 
 
+# The CLI instance a pool worker scores with (set once per process)
+_WORKER_CLI = None
+
+
+def _init_worker(argv):
+    """Pool initializer building a CLI from the parent's arguments"""
+    global _WORKER_CLI
+    _WORKER_CLI = SurgeoCLI(argv)
+
+
+def _process_in_worker(df):
+    """Score one dataframe in a pool worker"""
+    return _WORKER_CLI._process_df(df)
+
+
+def _queue_lines(lines, line_queue):
+    """Reader thread target putting each line (then None) on a queue"""
+    for line in lines:
+        line_queue.put(line)
+    line_queue.put(None)
+
+
 if __name__ == '__main__':
+    # A frozen executable must not rerun the CLI in its pool workers
+    multiprocessing.freeze_support()
     cli = SurgeoCLI()
     cli.main()
     sys.exit(0)
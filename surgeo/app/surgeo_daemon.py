@@ -0,0 +1,218 @@
+"""Script containing a background daemon that runs CLI jobs warm."""
+
+import argparse
+import json
+import os
+import pathlib
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+
+from surgeo.app.daemon_client import get_socket_path
+from surgeo.app.daemon_client import is_own_socket
+from surgeo.app.surgeo_cli import SurgeoCLI
+from surgeo.models import base_model
+from surgeo.utility.surgeo_exception import SurgeoException
+
+
+class SurgeoDaemon(object):
+    """A background process that runs "surgeo" CLI jobs with loaded models
+
+    Each CLI call normally imports pandas and loads the reference tables it
+    needs before scoring a single row, which dominates the run time of small
+    files. This daemon loads the tables once and listens on a Unix domain
+    socket. While it is running, "surgeo input.csv output.csv surgeo" (and
+    SurgeoCLI) sends its arguments to the daemon and waits for the job to
+    finish instead of doing the work itself. When no daemon is listening,
+    the CLI runs in-process as before.
+
+    The socket is $SURGEO_SOCKET if set, otherwise surgeo.sock in
+    $XDG_RUNTIME_DIR, and otherwise daemon.sock in a per-user directory in
+    the temporary directory. It is only accessible to the user who started
+    the daemon, and the CLI only uses a socket owned by its own user.
+
+    Jobs run one at a time in the daemon's only thread; other calls wait for
+    their turn. Models keep per-call state (e.g. dedup_ratio) and --workers
+    forks a process pool, neither of which is safe alongside another job.
+
+    Example
+    -------
+        .. code-block::
+
+            $ surgeo daemon --help
+
+            usage: surgeo daemon [-h] [--socket SOCKET]
+
+            Run Surgeo CLI jobs in a background process.
+
+            optional arguments:
+            -h, --help       show this help message and exit
+            --socket SOCKET  The Unix socket to listen on
+
+    """
+
+    def __init__(self, argv=None):
+        # Parse args
+        args = self._get_parsed_args(argv)
+        # Add those arguments as members
+        if args.socket is not None:
+            self._socket_path = pathlib.Path(args.socket)
+        else:
+            self._socket_path = get_socket_path()
+        # The default socket lives in a directory only this user can access
+        self._private_dir = None
+        if args.socket is None and not os.environ.get('SURGEO_SOCKET'):
+            self._private_dir = self._socket_path.parent
+        # Models built by one job are reused by the next
+        self._models = {}
+
+    def main(self):
+        """This is the public interface function for the daemon.
+
+        It loads every reference table, binds the socket, and runs jobs
+        until it is interrupted (e.g. Ctrl+C or SIGTERM), at which point the
+        socket file is removed.
+
+        Raises
+        ------
+        surgeo.utility.SurgeoException
+            Raised if the platform has no Unix domain sockets or if another
+            daemon is already listening on the socket.
+
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise SurgeoException(
+                'The daemon needs Unix domain sockets, which are not '
+                'available on this platform.'
+            )
+        server = self._make_server()
+        base_model.preload()
+        print(f'Surgeo daemon listening on {self._socket_path}', flush=True)
+        # Let SIGTERM shut down like Ctrl+C
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self._socket_path.unlink(missing_ok=True)
+
+    def _make_server(self):
+        """Bind a Unix socket server that routes to this instance"""
+        if self._private_dir is not None:
+            self._make_private_dir(self._private_dir)
+        if os.path.lexists(self._socket_path):
+            # Never connect to (or remove) another user's file
+            if not is_own_socket(self._socket_path):
+                raise SurgeoException(
+                    f'"{self._socket_path}" exists and is not a socket '
+                    'owned by you.'
+                )
+            # Refuse to replace a live daemon, but clear a stale socket
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(str(self._socket_path))
+                except OSError:
+                    self._socket_path.unlink()
+                else:
+                    raise SurgeoException(
+                        f'A daemon is already listening on '
+                        f'"{self._socket_path}".'
+                    )
+        # Create the socket file readable by this user only
+        old_umask = os.umask(0o177)
+        try:
+            server = socketserver.UnixStreamServer(
+                str(self._socket_path),
+                _SurgeoDaemonHandler,
+            )
+        finally:
+            os.umask(old_umask)
+        server.surgeo_daemon = self
+        return server
+
+    def _make_private_dir(self, directory):
+        """Create the default socket's directory, accessible to this user only"""
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = os.stat(directory)
+        # Another user could have created it first in a shared temp dir
+        if info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise SurgeoException(
+                f'"{directory}" must be a directory only you can access.'
+            )
+
+    def _run_job(self, argv, cwd):
+        """Run one CLI job and build the reply for the client"""
+        try:
+            cli = SurgeoCLI([*argv, '--no_daemon'])
+        except SystemExit:
+            # Let the client run it so argparse reports to the right terminal
+            return {'status': 'fallback'}
+        # Arguments that parse but do not fit together are job errors
+        except SurgeoException as e:
+            return {'error': str(e)}
+        except Exception as e:
+            traceback.print_exc()
+            return {'error': f'{type(e).__name__}: {e}'}
+        # Resolve paths from the client's working directory
+        cli._input_path = pathlib.Path(cwd, cli._input_path)
+        cli._output_path = pathlib.Path(cwd, cli._output_path)
+        cli._models = self._models
+        try:
+            cli.main()
+        except SurgeoException as e:
+            return {'error': str(e)}
+        except Exception as e:
+            traceback.print_exc()
+            return {'error': f'{type(e).__name__}: {e}'}
+        return {'status': 'ok'}
+
+    def _get_parsed_args(self, argv):
+        """Create an argument parser and parse the daemon arguments"""
+        # Create parser
+        parser = argparse.ArgumentParser(
+            prog='surgeo daemon',
+            description='Run Surgeo CLI jobs in a background process.',
+        )
+        # Socket argument
+        parser.add_argument(
+            '--socket',
+            help='The Unix socket to listen on',
+            dest='socket',
+        )
+        # Parse args and return
+        parsed_args = parser.parse_args(argv)
+        return parsed_args
+
+
+class _SurgeoDaemonHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON job per connection and writes one JSON reply"""
+
+    def handle(self):
+        """Run the job sent by daemon_client.run_in_daemon()"""
+        request_line = self.rfile.readline()
+        # Connections that send nothing are liveness probes
+        if not request_line:
+            return
+        try:
+            request = json.loads(request_line)
+            argv, cwd = request['argv'], request['cwd']
+        except (ValueError, KeyError, TypeError):
+            reply = {'error': 'Malformed request to the Surgeo daemon.'}
+        else:
+            reply = self.server.surgeo_daemon._run_job(argv, cwd)
+        self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+
+def _raise_interrupt(signum, frame):
+    """Signal handler turning SIGTERM into a KeyboardInterrupt"""
+    raise KeyboardInterrupt
+
+
+if __name__ == '__main__':
+    daemon = SurgeoDaemon()
+    daemon.main()
+    sys.exit(0)
@@ -13,6 +13,13 @@ import pandas as pd
 
 import surgeo
 
+from surgeo.utility.columnar_io import is_columnar
+from surgeo.utility.columnar_io import read_columnar
+from surgeo.utility.columnar_io import write_columnar
+from surgeo.utility.csv_io import is_csv
+from surgeo.utility.csv_io import write_csv
+from surgeo.utility.excel_io import read_excel
+from surgeo.utility.excel_io import write_excel
 from surgeo.utility.surgeo_exception import SurgeoException
 from surgeo.models.bifsg_model import BIFSGModel
 from surgeo.models.first_name_model import FirstNameModel
@@ -91,8 +98,12 @@ class SurgeoGUI(object):
             title='Select Input Path',
             filetypes=(
                 ('CSV files' , '*.csv' ),
+                ('Compressed CSV', ('*.csv.gz', '*.csv.bz2', '*.csv.xz')),
                 ('Excel XLSX', '*.xlsx'),
-                ('Excel XLS' , '*.xls' )
+                ('Excel XLS' , '*.xls' ),
+                ('Parquet'   , '*.parquet'),
+                ('Feather'   , '*.feather'),
+                ('Arrow'     , '*.arrow'  ),
             )
         )
         # Populate variable (in turn, updates screen)
@@ -104,6 +115,9 @@ class SurgeoGUI(object):
         files = (
             ('CSV files' , '*.csv' ),
             ('Excel XLSX', '*.xlsx'),
+            ('Parquet'   , '*.parquet'),
+            ('Feather'   , '*.feather'),
+            ('Arrow'     , '*.arrow'  ),
         )
         # Get filename from dialog
         output_filename = filedialog.asksaveasfilename(
@@ -323,21 +337,56 @@ class SurgeoGUI(object):
                 raise SurgeoException(f'{surname_var} not in input data. '
                                       f'Columns are: {df.columns}.')
 
-    def _load_df(self, input_path):
-        """This creates a dataframe based on self._input_path"""
+    def _get_input_columns(self):
+        """List the input columns the selected model reads"""
+        first_name_var = self._objects['first_name_var'].get()
+        surname_var = self._objects['surname_var'].get()
+        zip_var = self._objects['zip_var'].get()
+        model_var = self._objects['model_var'].get()
+        if model_var == 'First Name':
+            return [first_name_var]
+        elif model_var == 'Geocode':
+            return [zip_var]
+        elif model_var == 'Surname':
+            return [surname_var]
+        elif model_var == 'BIFSG':
+            return [first_name_var, surname_var, zip_var]
+        else: # model_var == 'Surgeo (Surname + Geocode)':
+            return [surname_var, zip_var]
+
+    def _load_df(self, input_path, columns=None):
+        """This creates a dataframe based on self._input_path
+
+        If columns are given, only those are read. Text formats are read as
+        strings without dtype inference.
+        """
         path = pathlib.Path(input_path)
         suffix = path.suffix
-        # If it's excel, read_excel()
+        # Skip (rather than fail on) missing columns in text formats so
+        # that _check_inputs() can name them
+        if columns is None:
+            usecols = None
+        else:
+            usecols = set(columns).__contains__
+        # If it's excel, stream it with openpyxl's read-only mode
         if suffix == '.xlsx' or suffix == 'xls':
-            df = pd.read_excel(path, engine='openpyxl')
-        # If CSV, read read_csv()
-        elif suffix == '.csv':
-            df = pd.read_csv(path, skip_blank_lines=False)
+            df = read_excel(path, usecols)
+        # If CSV, read read_csv() (which undoes any compression)
+        elif is_csv(path):
+            df = pd.read_csv(
+                path,
+                skip_blank_lines=False,
+                usecols=usecols,
+                dtype=str,
+            )
+        # If columnar, read_columnar()
+        elif is_columnar(path):
+            df = read_columnar(path, columns)
         # If path is unrecognized, throw error
         else:
             raise SurgeoException(
-                f'File ending for "{path}" not '
-                'recognized. Please use .csv or .xlsx.'
+                f'File ending for "{path}" not recognized. '
+                'Please use .csv, .xlsx, .parquet, .feather, or .arrow.'
             )
         return df
 
@@ -363,12 +412,12 @@ class SurgeoGUI(object):
         zip_var = self._objects['zip_var'].get()
         # Model being run from drop down window
         model_var = self._objects['model_var'].get()
-        # Output path suffix (to determine if .csv or .xlsx)
+        # Output path suffix (to determine if .csv, .xlsx, or columnar)
         suffix = pathlib.Path(output_var).suffix
         # This large try block captures any errors for error window
         try:
             # Load the dataframe
-            input_df = self._load_df(input_var)
+            input_df = self._load_df(input_var, self._get_input_columns())
             # Ensure the inputs are OK
             self._check_inputs(input_df)
             # If first name, run the first name model assign result to df
@@ -399,12 +448,15 @@ class SurgeoGUI(object):
                     input_df[surname_var],
                     input_df[zip_var]
                 )
-            # If output is .xlsx, write to Excel
+            # If output is .xlsx, write to Excel (splitting across sheets)
             if suffix == '.xlsx':
-                output_df.to_excel(output_var, index=False)
-            # Otherwise write to CSV
+                write_excel(output_var, output_df)
+            # If output is columnar, keep the probabilities typed
+            elif is_columnar(output_var):
+                write_columnar(output_var, output_df)
+            # Otherwise write to CSV (compressed if it ends in .gz, etc.)
             else:
-                output_df.to_csv(output_var, index=False)
+                write_csv(output_var, output_df)
             # Show message on success
             if show_msgbox:
                 messagebox.showinfo(
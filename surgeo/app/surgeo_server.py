@@ -0,0 +1,408 @@
+"""Script containing a local HTTP scoring service."""
+
+import argparse
+import http.server
+import json
+import os
+import signal
+import sys
+import threading
+import traceback
+
+import pandas as pd
+
+from surgeo.utility.micro_batcher import MicroBatcher
+from surgeo.utility.surgeo_exception import SurgeoException
+from surgeo.models.bifsg_model import BIFSGModel
+from surgeo.models.first_name_model import FirstNameModel
+from surgeo.models.geocode_model import GeocodeModel
+from surgeo.models.surgeo_model import SurgeoModel
+from surgeo.models.surname_model import SurnameModel
+
+
+class SurgeoServer(object):
+    """A local HTTP service that keeps every model warm between requests
+
+    The CLI pays for Python, pandas, and the reference tables on each run.
+    This class loads all of the models once and then answers JSON requests
+    on localhost, so each request only pays for scoring. With more than
+    one worker, the listening socket and the loaded tables are forked into
+    that many processes, which share the tables copy-on-write.
+
+    Example
+    -------
+        .. code-block::
+
+            $ surgeo serve --help
+
+            usage: surgeo serve [-h] [--host HOST] [--port PORT]
+                                [--workers WORKERS]
+                                [--max_batch_size MAX_BATCH_SIZE]
+                                [--max_latency_ms MAX_LATENCY_MS]
+
+            Serve Surgeo models over HTTP.
+
+            optional arguments:
+            -h, --help         show this help message and exit
+            --host HOST        The address to listen on (default 127.0.0.1)
+            --port PORT        The port to listen on (default 8000)
+            --workers WORKERS  The number of processes serving requests
+            --max_batch_size MAX_BATCH_SIZE
+                               Records at which a micro-batch runs at once
+            --max_latency_ms MAX_LATENCY_MS
+                               Wait up to this long to batch concurrent
+                               requests (default 0, i.e. no batching)
+
+    Endpoints
+    ---------
+    GET /health
+        Returns {"status": "ok", "models": [...]}.
+    POST /<model>
+        Takes {"records": [{...}, ...]} and returns {"results": [...]},
+        with one result per record in the same order.
+    POST /<model>/one
+        Takes a single record {...} and returns its result {...}.
+
+    <model> and the fields of its records are:
+
+    * "first": first_name
+    * "sur": name
+    * "geo": zcta5
+    * "geo_tract": state, county, tract
+    * "bifsg": first_name, surname, zcta5
+    * "surgeo": name, zcta5
+    * "surgeo_tract": name, state, county, tract
+
+    Results have the same fields as the rows of each model's
+    get_probabilities() output; probabilities that cannot be computed are
+    null.
+
+    If --max_latency_ms is above zero, concurrent batch requests for the
+    same model are combined by a MicroBatcher into a single
+    get_probabilities() call of up to --max_batch_size records.
+
+    """
+
+    # Record fields of each model, in the order the model takes them
+    _MODEL_FIELDS = {
+        'first': ['first_name'],
+        'sur': ['name'],
+        'geo': ['zcta5'],
+        'geo_tract': ['state', 'county', 'tract'],
+        'bifsg': ['first_name', 'surname', 'zcta5'],
+        'surgeo': ['name', 'zcta5'],
+        'surgeo_tract': ['name', 'state', 'county', 'tract'],
+    }
+
+    def __init__(self, argv=None):
+        # Parse args
+        args = self._get_parsed_args(argv)
+        # Add those arguments as members
+        self._host = args.host
+        self._port = args.port
+        self._workers = args.workers
+        self._max_batch_size = args.max_batch_size
+        self._max_latency_ms = args.max_latency_ms
+        # Micro-batchers are started on first use (i.e. after forking)
+        self._batchers = {}
+        self._batchers_lock = threading.Lock()
+        # One instance of each model serves every request
+        self._models = {
+            'first': FirstNameModel(),
+            'sur': SurnameModel(),
+            'geo': GeocodeModel(),
+            'geo_tract': GeocodeModel('TRACT'),
+            'bifsg': BIFSGModel(),
+            'surgeo': SurgeoModel(),
+            'surgeo_tract': SurgeoModel('TRACT'),
+        }
+
+    def main(self):
+        """This is the public interface function for the service.
+
+        It loads every model, binds the port, and serves requests until it
+        is interrupted (e.g. Ctrl+C or SIGTERM).
+
+        Raises
+        ------
+        surgeo.utility.SurgeoException
+            Raised if the worker count is invalid or if several workers are
+            requested on a platform that cannot fork.
+
+        """
+        if self._workers < 1:
+            raise SurgeoException('--workers must be a positive integer.')
+        if self._max_batch_size < 1 or self._max_latency_ms < 0:
+            raise SurgeoException(
+                '--max_batch_size must be positive and '
+                '--max_latency_ms cannot be negative.'
+            )
+        if self._workers > 1 and not hasattr(os, 'fork'):
+            raise SurgeoException(
+                'Multiple workers need os.fork(). Please use --workers 1.'
+            )
+        self._warm_models()
+        server = self._make_server()
+        host, port = server.server_address[:2]
+        print(f'Serving Surgeo on http://{host}:{port}', flush=True)
+        # Let SIGTERM shut down like Ctrl+C
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        try:
+            if self._workers == 1:
+                server.serve_forever()
+            else:
+                self._serve_forked(server)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+    def _warm_models(self):
+        """Load every table and build every lookup before serving"""
+        for model_type, fields in self._MODEL_FIELDS.items():
+            empty_record = dict.fromkeys(fields)
+            self._score_records(model_type, [empty_record], batched=False)
+            self._score_one(model_type, empty_record)
+
+    def _make_server(self):
+        """Bind a threaded HTTP server that routes to this instance"""
+        server = http.server.ThreadingHTTPServer(
+            (self._host, self._port),
+            _SurgeoRequestHandler,
+        )
+        server.surgeo_server = self
+        return server
+
+    def _serve_forked(self, server):
+        """Serve from self._workers child processes sharing one socket"""
+        children = []
+        try:
+            for _ in range(self._workers):
+                pid = os.fork()
+                if pid == 0:
+                    # Children are stopped by their parent (or Ctrl+C)
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    try:
+                        server.serve_forever()
+                    finally:
+                        os._exit(0)
+                children.append(pid)
+            for pid in children:
+                os.waitpid(pid, 0)
+        finally:
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def _get_fields(self, model_type):
+        """Look up the record fields of a model (or raise an error)"""
+        try:
+            return self._MODEL_FIELDS[model_type]
+        except KeyError:
+            raise SurgeoException(
+                f'"{model_type}" is not valid model type. '
+                f'Please use one of {list(self._MODEL_FIELDS)}.'
+            )
+
+    def _get_score_function(self, model_type, batched=True):
+        """Get the batch scoring function of a model
+
+        This is the model's get_probabilities() (or the tract version)
+        unless micro-batching is on and batched is True, in which case it
+        goes through the model's MicroBatcher.
+        """
+        model = self._models[model_type]
+        if model_type == 'geo_tract':
+            score_function = model.get_probabilities_tract
+        else:
+            score_function = model.get_probabilities
+        if self._max_latency_ms <= 0 or not batched:
+            return score_function
+        with self._batchers_lock:
+            if model_type not in self._batchers:
+                self._batchers[model_type] = MicroBatcher(
+                    score_function,
+                    self._max_batch_size,
+                    self._max_latency_ms,
+                )
+            return self._batchers[model_type].score
+
+    def _score_records(self, model_type, records, batched=True):
+        """Score a list of records with one get_probabilities() call"""
+        fields = self._get_fields(model_type)
+        if not isinstance(records, list) or not all(
+            isinstance(record, dict) for record in records
+        ):
+            raise SurgeoException('"records" must be a list of objects.')
+        for record in records:
+            self._check_values(record, fields)
+        df = pd.DataFrame(
+            {
+                field: pd.Series(
+                    [record.get(field) for record in records],
+                    dtype=object,
+                )
+                for field in fields
+            }
+        )
+        score_function = self._get_score_function(model_type, batched)
+        if model_type == 'geo_tract':
+            result = score_function(df)
+        elif model_type == 'surgeo_tract':
+            result = score_function(df['name'], df[fields[1:]])
+        else:
+            result = score_function(*[df[field] for field in fields])
+        # Missing values become null in the JSON
+        result = result.astype(object).where(result.notna(), None)
+        return result.to_dict(orient='records')
+
+    def _score_one(self, model_type, record):
+        """Score a single record with the model's score_one()"""
+        fields = self._get_fields(model_type)
+        if not isinstance(record, dict):
+            raise SurgeoException('The record must be an object.')
+        self._check_values(record, fields)
+        values = [record.get(field) for field in fields]
+        model = self._models[model_type]
+        if model_type == 'geo_tract':
+            result = model.score_one_tract(*values)
+        elif model_type == 'surgeo_tract':
+            result = model.score_one(values[0], tuple(values[1:]))
+        else:
+            result = model.score_one(*values)
+        # Missing values become null in the JSON
+        return {
+            key: None if pd.isna(value) else value
+            for key, value in result.items()
+        }
+
+    def _check_values(self, record, fields):
+        """Make sure each field of a record is a single value"""
+        for field in fields:
+            if isinstance(record.get(field), (list, dict)):
+                raise SurgeoException(
+                    f'"{field}" must be a string or number, not '
+                    f'{type(record[field]).__name__}.'
+                )
+
+    def _get_parsed_args(self, argv):
+        """Create an argument parser and parse the service arguments"""
+        # Create parser
+        parser = argparse.ArgumentParser(
+            prog='surgeo serve',
+            description='Serve Surgeo models over HTTP.',
+        )
+        # Address arguments
+        parser.add_argument(
+            '--host',
+            help='The address to listen on (default 127.0.0.1)',
+            dest='host',
+            default='127.0.0.1',
+        )
+        parser.add_argument(
+            '--port',
+            help='The port to listen on (default 8000)',
+            dest='port',
+            type=int,
+            default=8000,
+        )
+        # Optional number of worker processes
+        parser.add_argument(
+            '--workers',
+            help='The number of processes serving requests',
+            dest='workers',
+            type=int,
+            default=1,
+        )
+        # Micro-batching settings
+        parser.add_argument(
+            '--max_batch_size',
+            help='Records at which a micro-batch runs at once',
+            dest='max_batch_size',
+            type=int,
+            default=1024,
+        )
+        parser.add_argument(
+            '--max_latency_ms',
+            help=(
+                'Wait up to this long to batch concurrent requests '
+                '(default 0, i.e. no batching)'
+            ),
+            dest='max_latency_ms',
+            type=float,
+            default=0.0,
+        )
+        # Parse args and return
+        parsed_args = parser.parse_args(argv)
+        return parsed_args
+
+
+class _SurgeoRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Routes HTTP requests to the SurgeoServer bound to the server"""
+
+    # Keep connections open between requests
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Answer health checks"""
+        if self.path.rstrip('/') == '/health':
+            models = list(self.server.surgeo_server._MODEL_FIELDS)
+            self._send_json(200, {'status': 'ok', 'models': models})
+        else:
+            self._send_json(404, {'error': f'"{self.path}" not found.'})
+
+    def do_POST(self):
+        """Score a batch of records or a single record"""
+        surgeo_server = self.server.surgeo_server
+        parts = self.path.strip('/').split('/')
+        try:
+            body = self._read_json()
+            if len(parts) == 1:
+                if not isinstance(body, dict):
+                    raise SurgeoException('The body must be an object.')
+                results = surgeo_server._score_records(
+                    parts[0],
+                    body.get('records'),
+                )
+                payload = {'results': results}
+            elif len(parts) == 2 and parts[1] == 'one':
+                payload = surgeo_server._score_one(parts[0], body)
+            else:
+                self._send_json(404, {'error': f'"{self.path}" not found.'})
+                return
+        except (SurgeoException, ValueError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        # Anything else is a bug, but the client still gets an answer
+        except Exception as e:
+            traceback.print_exc()
+            self._send_json(500, {'error': f'{type(e).__name__}: {e}'})
+            return
+        self._send_json(200, payload)
+
+    def _read_json(self):
+        """Parse the request body as JSON"""
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def _send_json(self, status, payload):
+        """Write a JSON response"""
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _raise_interrupt(signum, frame):
+    """Signal handler turning SIGTERM into a KeyboardInterrupt"""
+    raise KeyboardInterrupt
+
+
+if __name__ == '__main__':
+    server = SurgeoServer()
+    server.main()
+    sys.exit(0)
@@ -1,12 +1,330 @@
 """Contains the base model for First Name, Surname, Geocode, BIFSG, and Surgeo models."""
 
+import hashlib
+import json
+import math
+import multiprocessing.shared_memory
+import os
 import pathlib
 import string
 import sys
+import threading
+import warnings
+import weakref
 
 import numpy as np
 import pandas as pd
 
+from surgeo.utility.surgeo_exception import SurgeoException
+
+
+# Bump whenever the layout of compiled reference tables changes
+_COMPILED_VERSION = 3
+
+# Reference tables by name:
+# (CSV file, index columns, index zfill width, pack index into a GEOID)
+_TABLE_SPECS = {
+    'race_given_zcta': (
+        'prob_race_given_zcta_2010.csv', ['zcta5'], 5, False,
+    ),
+    'race_given_tract': (
+        'prob_race_given_tract_2010.csv', ['state', 'county', 'tract'], None, True,
+    ),
+    'zcta_given_race': (
+        'prob_zcta_given_race_2010.csv', ['zcta5'], 5, False,
+    ),
+    'race_given_surname': (
+        'prob_race_given_surname_2010.csv', ['name'], None, False,
+    ),
+    'race_given_first_name': (
+        'prob_race_given_first_name_harvard.csv', ['name'], None, False,
+    ),
+    'first_name_given_race': (
+        'prob_first_name_given_race_harvard.csv', ['name'], None, False,
+    ),
+}
+
+# Whether a failure to compile a table has been reported in this process
+_COMPILE_WARNED = False
+
+# Process-wide registry of loaded tables shared by every model instance,
+# keyed by (table name, dtype name)
+_REGISTRY = {}
+_REGISTRY_LOCK = threading.RLock()
+
+# Unwanted characters in names, as a str translation table and as bytes
+_NAME_UNWANTED = string.digits + string.punctuation + string.whitespace
+_NAME_TRANSLATION = str.maketrans('', '', _NAME_UNWANTED)
+_NAME_DELETIONS = _NAME_UNWANTED.encode('ascii')
+
+# Suffixes dropped from the tail of names, in the order they are removed
+_NAME_SUFFIXES = ('JR', 'SR', 'III', 'IV')
+_NAME_SUFFIX_ENDINGS = frozenset(suffix[-1] for suffix in _NAME_SUFFIXES)
+
+# Probability dtypes a model can be created with
+_DTYPES = (np.dtype(np.float64), np.dtype(np.float32))
+
+# ZCTAs are five digit numbers; one extra slot takes malformed inputs
+_ZCTA_SLOTS = 100_000
+_ZCTA_MISS = _ZCTA_SLOTS
+
+# Tract GEOIDs pack state (2 digits), county (3) and tract (6) in an int64
+_GEOID_COLUMNS = ['state', 'county', 'tract']
+_GEOID_WIDTHS = [2, 3, 6]
+_GEOID_MISS = -1
+
+
+def _normalize_name(name: str) -> str:
+    r"""Normalize a single name consistent with Word et al (2007)
+
+    This removes digits, punctuation, and whitespace, upper cases the name,
+    and then drops each suffix in _NAME_SUFFIXES in turn. A suffix is
+    removed along with any trailing whitespace and one whitespace character
+    before it, where whitespace is anything (e.g. a non-breaking space)
+    that the translation table does not remove. With Python's str and re
+    semantics (i.e. object dtype strings), this is exactly the result of
+    the original chain of pandas string methods:
+
+        .str.translate(...)
+        .str.upper()
+        .str.replace(r'\s?J\.*?R\.*\s*?$', '', regex=True)
+        .str.replace(r'\s?S\.*?R\.*\s*?$', '', regex=True)
+        .str.replace(r'\s?III\s*?$',      '', regex=True)
+        .str.replace(r'\s?IV\s*?$',       '', regex=True)
+
+    Pyarrow-backed strings (the pandas 3 default) run that chain with
+    Arrow's upper casing and regular expressions instead, which differ on
+    some non-ASCII names. This function keeps the Python behavior, e.g.
+    "garcia\xa0jr" gives "GARCIA" (Arrow's \s is ASCII only, leaving
+    "GARCIA\xa0") and "\xdf" (sharp s) gives "SS" (Arrow gives "\u1e9e").
+
+    """
+    # ASCII names (nearly all) take the much faster bytes route
+    if name.isascii():
+        name = (
+            name.encode('ascii')
+                .translate(None, _NAME_DELETIONS)
+                .upper()
+                .decode('ascii')
+        )
+    else:
+        name = name.translate(_NAME_TRANSLATION).upper()
+    # Most names end in neither a suffix nor leftover whitespace
+    ending = name[-1:]
+    if ending not in _NAME_SUFFIX_ENDINGS and not ending.isspace():
+        return name
+    for suffix in _NAME_SUFFIXES:
+        stripped = name.rstrip()
+        if stripped.endswith(suffix):
+            name = stripped[:-len(suffix)]
+            if name[-1:].isspace():
+                name = name[:-1]
+    return name
+
+
+def preload(*table_names: str, dtype=np.float64):
+    """Load reference tables into the process-wide registry.
+
+    Models pull their tables from this registry, so preloading moves the
+    load cost to a point of the caller's choosing (e.g. worker startup).
+
+    Parameters
+    ----------
+    table_names : str
+        Names of the tables to load (see loaded_tables() for the naming).
+        All tables are loaded if none are given.
+    dtype : np.dtype
+        The dtype of the models that will use the tables (np.float64 or
+        np.float32)
+
+    """
+    model = BaseModel(dtype=dtype)
+    for table_name in table_names or _TABLE_SPECS:
+        model._get_table(table_name)
+
+
+def evict(*table_names: str):
+    """Drop reference tables from the process-wide registry.
+
+    Memory is released once no model instance still holds the table. The
+    next model that needs an evicted table loads it again.
+
+    Parameters
+    ----------
+    table_names : str
+        Names of the tables to drop (in every dtype). All tables are
+        dropped if none are given.
+
+    """
+    with _REGISTRY_LOCK:
+        for key in list(_REGISTRY):
+            if not table_names or key[0] in table_names:
+                del _REGISTRY[key]
+
+
+def loaded_tables() -> list:
+    """List the names of the tables currently held in the registry.
+
+    Table names are "race_given_zcta", "race_given_tract",
+    "zcta_given_race", "race_given_surname", "race_given_first_name", and
+    "first_name_given_race".
+
+    """
+    with _REGISTRY_LOCK:
+        return list(dict.fromkeys(table_name for table_name, _ in _REGISTRY))
+
+
+def share_tables(*table_names: str, dtype=np.float64) -> dict:
+    """Copy reference tables into shared memory for other processes.
+
+    Each table's probabilities and keys are copied once into
+    multiprocessing.shared_memory blocks. The returned handle is small and
+    picklable; pass it to attach_tables() in each worker process so that
+    all of them read the same physical pages instead of loading their own
+    copies. Call release_tables() with the handle once the workers finish.
+
+    This is a library API for code that runs its own process pool. The CLI
+    does not use it: its --workers pool forks where it can, so the workers
+    inherit the parent's tables, and spawned workers memory-map the
+    compiled tables from disk.
+
+    Parameters
+    ----------
+    table_names : str
+        Names of the tables to share (see loaded_tables() for the naming).
+        All tables are shared if none are given.
+    dtype : np.dtype
+        The dtype of the models that will use the tables (np.float64 or
+        np.float32)
+
+    Returns
+    -------
+    dict
+        A handle describing the shared blocks of each table
+
+    """
+    model = BaseModel(dtype=dtype)
+    handle = {}
+    try:
+        for table_name in table_names or _TABLE_SPECS:
+            df = model._get_table(table_name)
+            levels = [
+                df.index.get_level_values(i)
+                for i in range(df.index.nlevels)
+            ]
+            handle[table_name] = {
+                'columns': list(df.columns),
+                'values': _share_array(df.to_numpy()),
+                'index': [
+                    (
+                        level.name,
+                        _share_array(
+                            level.to_numpy()
+                            if level.dtype.kind in 'iu'
+                            else level.to_numpy(dtype=str)
+                        ),
+                    )
+                    for level in levels
+                ],
+            }
+    except BaseException:
+        release_tables(handle)
+        raise
+    return handle
+
+
+def attach_tables(handle: dict):
+    """Register shared reference tables in this process's registry.
+
+    The probabilities (and integer keys, i.e. tract GEOIDs) become
+    read-only views of the shared blocks without being copied. String keys
+    (names and ZCTAs) are rebuilt from the shared block, which is a copy
+    but involves no CSV parsing. Models created afterwards use the
+    attached tables.
+
+    This process maps each block until the table is evicted (or replaced
+    by attaching another handle) and no model still uses it.
+
+    Parameters
+    ----------
+    handle : dict
+        The handle returned by share_tables() in the parent process
+
+    """
+    for table_name, spec in handle.items():
+        values = _attach_array(spec['values'])
+        levels = [
+            pd.Index(_attach_array(level_spec), name=level_name, copy=False)
+            for level_name, level_spec in spec['index']
+        ]
+        if len(levels) == 1:
+            index = levels[0]
+        else:
+            index = pd.MultiIndex.from_arrays(levels)
+        with _REGISTRY_LOCK:
+            _REGISTRY[table_name, values.dtype.name] = pd.DataFrame(
+                values,
+                index=index,
+                columns=spec['columns'],
+                copy=False,
+            )
+
+
+def release_tables(handle: dict):
+    """Free the shared memory behind a handle from share_tables().
+
+    Processes that already attached the tables keep working; the memory is
+    returned to the system once the last of them exits.
+
+    Parameters
+    ----------
+    handle : dict
+        The handle returned by share_tables()
+
+    """
+    for spec in handle.values():
+        block_specs = [spec['values']]
+        block_specs.extend(level_spec for _, level_spec in spec['index'])
+        for block_name, _, _ in block_specs:
+            try:
+                block = multiprocessing.shared_memory.SharedMemory(block_name)
+            except FileNotFoundError:
+                continue
+            block.close()
+            block.unlink()
+
+
+def _share_array(array: np.ndarray) -> tuple:
+    """Copy an array into a new shared memory block
+
+    Returns the (block name, shape, dtype) needed to attach to it.
+    """
+    block = multiprocessing.shared_memory.SharedMemory(
+        create=True,
+        size=max(array.nbytes, 1),
+    )
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+    del shared
+    block.close()
+    return block.name, array.shape, array.dtype.str
+
+
+def _attach_array(block_spec: tuple) -> np.ndarray:
+    """Get a read-only array view of a block made by _share_array()
+
+    Every view of the array (e.g. a table's values) keeps it alive, so the
+    block is unmapped once the last of them is gone. Closing it any sooner
+    would leave those views reading unmapped memory.
+    """
+    block_name, shape, dtype = block_spec
+    block = multiprocessing.shared_memory.SharedMemory(block_name)
+    array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    array.flags.writeable = False
+    # Not at exit, where module globals may still hold views
+    weakref.finalize(array, block.close).atexit = False
+    return array
+
 
 class BaseModel(object):
     """Base class for the first name, surname, geocode, bifsg, and
@@ -17,9 +335,30 @@ class BaseModel(object):
     of responsibility for the subclass. This base class does the following
     operations:
 
-    1. Creating functions to provide lookup dataframes; and,
+    1. Creating functions to provide lookup dataframes (which are compiled
+       to a binary format on first use so later loads memory-map them
+       instead of parsing CSVs, and which are shared by all models through
+       a process-wide registry); and,
     2. Housing normalization routines for dirty ZIP code and name data.
 
+    Subclasses expose their tables as cached properties listed in
+    _TABLE_ATTRIBUTES. Tables are loaded when first used unless load() is
+    called beforehand; is_loaded() reports whether this has happened.
+
+    Besides the vectorized get_probabilities(), every model has a
+    score_one() method for a single record. It normalizes the inputs with
+    scalar versions of the routines below and looks rows up in dicts built
+    from the tables on first use, so it avoids pandas entirely while
+    giving the same results as a one-row get_probabilities() call.
+
+    Every model takes a `dtype` argument. With the default np.float64,
+    tables and results are double precision. With np.float32, tables,
+    intermediate products and results are single precision, which halves
+    their memory. Each float32 probability is then within 1e-6 of its
+    float64 counterpart: at most 16 float32 roundings (unit roundoff
+    6e-8) go into a BIFSG posterior, 12 into a BISG posterior, and 1 into
+    a lookup, and all probabilities are at most 1.
+
     Note
     ----
     Names are normalized in a manner consistent with Word et. al (2007)
@@ -43,7 +382,16 @@ class BaseModel(object):
 
     """
 
-    def __init__(self):
+    # Names of the lazily loaded table attributes (set by subclasses)
+    _TABLE_ATTRIBUTES = ()
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in _DTYPES:
+            raise SurgeoException(
+                f'"{dtype}" is not a valid dtype. '
+                'Please use np.float64 or np.float32.'
+            )
         # https://cx-freeze.readthedocs.io/en/latest/faq.html#using-data-files
         # If it's frozen, we can't use __file__
         if getattr(sys, 'frozen', False):
@@ -53,103 +401,536 @@ class BaseModel(object):
         else:
             # The application is not frozen
             self._package_root = pathlib.Path(__file__).parents[1]
+        self._cache_root = self._get_cache_root()
+
+    def load(self):
+        """Load all of the model's reference tables now.
+
+        Tables are otherwise loaded on first use (i.e. the first call to
+        get_probabilities()). This allows a service to warm up a model at a
+        time of its choosing.
+
+        Returns
+        -------
+        BaseModel
+            The model itself (to allow chaining)
+
+        """
+        for attribute in self._TABLE_ATTRIBUTES:
+            getattr(self, attribute)
+        return self
+
+    def is_loaded(self) -> bool:
+        """Check whether all of the model's reference tables are loaded.
+
+        Returns
+        -------
+        bool
+            True if the tables are in memory, False if they will be loaded
+            on next use
+
+        """
+        return all(
+            attribute in self.__dict__
+            for attribute in self._TABLE_ATTRIBUTES
+        )
+
+    def _get_cache_root(self) -> pathlib.Path:
+        """Choose the directory compiled reference tables are kept in
+
+        This is $SURGEO_CACHE_DIR if set, otherwise "compiled" in the
+        package's data directory if that can be written to (e.g. not a
+        read-only site-packages), and otherwise a per-user cache directory
+        ($XDG_CACHE_HOME/surgeo or ~/.cache/surgeo).
+        """
+        cache_root = os.environ.get('SURGEO_CACHE_DIR')
+        if cache_root:
+            return pathlib.Path(cache_root)
+        data_path = self._package_root / 'data'
+        package_cache = data_path / 'compiled'
+        if package_cache.exists():
+            if os.access(package_cache, os.W_OK):
+                return package_cache
+        elif os.access(data_path, os.W_OK):
+            return package_cache
+        user_cache = os.environ.get('XDG_CACHE_HOME')
+        if user_cache:
+            return pathlib.Path(user_cache) / 'surgeo'
+        return pathlib.Path.home() / '.cache' / 'surgeo'
 
     def _get_prob_race_given_zcta(self):
         """Create dataframe of race probs given ZCTA (for Geo)"""
-        prob_race_given_zcta = pd.read_csv(
-            self._package_root / 'data' / 'prob_race_given_zcta_2010.csv',
-            index_col='zcta5',
-            na_values=[''],
-            keep_default_na=False,
-        )
-        # Convert geocode zip codes to 00000-formatted strings
-        prob_race_given_zcta.index = (
-            prob_race_given_zcta.index.astype('str')
-                                .str.zfill(5)
-        )
-        return prob_race_given_zcta
-        
-    def _get_prob_race_given_tract(self):
-        prob_race_given_tract = pd.read_csv(
-            self._package_root / 'data' / 'prob_race_given_tract_2010.csv',
-            na_values=[''],
-            keep_default_na=False,
-            dtype={'state':str,'county':str,'tract':str}
-        ).set_index(['state','county','tract'])
-        return prob_race_given_tract
+        return self._get_table('race_given_zcta')
 
+    def _get_prob_race_given_tract(self):
+        """Create dataframe of race probs given State/County/Tract"""
+        return self._get_table('race_given_tract')
 
     def _get_prob_zcta_given_race(self):
         """Create dataframe of ZCTA ratios given a race (for SurGeo)"""
-        prob_zcta_given_race = pd.read_csv(
-            self._package_root / 'data' / 'prob_zcta_given_race_2010.csv',
-            index_col='zcta5',
-            na_values=[''],
-            keep_default_na=False,
-        )
-        # Convert geocode zip codes to 00000-formatted strings
-        prob_zcta_given_race.index = (
-            prob_zcta_given_race.index.astype('str')
-                                .str.zfill(5)
-        )
-        return prob_zcta_given_race
+        return self._get_table('zcta_given_race')
 
     def _get_prob_race_given_surname(self):
         """Create dataframe of race probabilities given surnames (for Sur)"""
-        # Create surname df (beware ... some NA values like "NAN" are names)
-        prob_race_given_surname = pd.read_csv(
-            self._package_root / 'data' / 'prob_race_given_surname_2010.csv',
-            index_col='name',
-            na_values=[''],
-            keep_default_na=False,
-        )
-        return prob_race_given_surname
+        return self._get_table('race_given_surname')
 
     def _get_prob_race_given_first_name(self):
         """Create dataframe of race probabilities given first names (for First)"""
-        # Create first name df (beware ... some NA values like "NAN" are names)
-        prob_race_given_first_name = pd.read_csv(
-            self._package_root / 'data' / 'prob_race_given_first_name_harvard.csv',
-            index_col='name',
-            na_values=[''],
-            keep_default_na=False,
-        )
-        return prob_race_given_first_name
+        return self._get_table('race_given_first_name')
 
     def _get_prob_first_name_given_race(self):
         """Create dataframe of first name ratios given a race (for BIFSG)"""
-        prob_first_name_given_race = pd.read_csv(
-            self._package_root / 'data' / 'prob_first_name_given_race_harvard.csv',
-            index_col='name',
+        return self._get_table('first_name_given_race')
+
+    def _get_table(self, table_name: str) -> pd.DataFrame:
+        """Get a read-only view of a table from the process-wide registry
+
+        The table is loaded and registered (in the model's dtype) on first
+        request. Every caller gets its own shallow copy, so the data is
+        shared but a caller cannot replace the index or columns that other
+        models see.
+        """
+        key = (table_name, self.dtype.name)
+        with _REGISTRY_LOCK:
+            if key not in _REGISTRY:
+                try:
+                    file_name, index_cols, zfill, geoid = (
+                        _TABLE_SPECS[table_name]
+                    )
+                except KeyError:
+                    raise SurgeoException(
+                        f'"{table_name}" is not a valid table. '
+                        f'Please use one of {list(_TABLE_SPECS)}.'
+                    )
+                df = self._load_table(file_name, index_cols, zfill, geoid)
+                # Lock the shared values so no model can write to them
+                # (memory-mapped values are read-only already)
+                values = df.to_numpy(dtype=self.dtype)
+                values.flags.writeable = False
+                _REGISTRY[key] = pd.DataFrame(
+                    values,
+                    index=df.index,
+                    columns=df.columns,
+                    copy=False,
+                )
+            return _REGISTRY[key].copy(deep=False)
+
+    def _load_table(self,
+                    file_name: str,
+                    index_cols: list,
+                    zfill: int = None,
+                    geoid: bool = False) -> pd.DataFrame:
+        """Load a reference table from its compiled form or from CSV
+
+        The compiled form is used if it was made from the current source
+        CSV. Otherwise the CSV is parsed and (re)compiled so that the next
+        load is fast. Any problem with the compiled form results in a plain
+        CSV load.
+        """
+        csv_path = self._package_root / 'data' / file_name
+        compiled_path = self._cache_root / csv_path.stem
+        try:
+            return self._read_compiled(compiled_path, csv_path)
+        except (OSError, ValueError, KeyError):
+            pass
+        df = self._read_csv_table(csv_path, index_cols, zfill, geoid)
+        try:
+            self._write_compiled(df, compiled_path, csv_path)
+        except (OSError, ValueError) as e:
+            self._warn_compile_failed(compiled_path, e)
+        return df
+
+    def _warn_compile_failed(self, compiled_path: pathlib.Path, error):
+        """Warn (once per process) that tables will keep loading from CSV"""
+        global _COMPILE_WARNED
+        if _COMPILE_WARNED:
+            return
+        _COMPILE_WARNED = True
+        warnings.warn(
+            f'Cannot compile reference table to "{compiled_path}" ({error}). '
+            'Tables will be parsed from CSV on every load; set '
+            'SURGEO_CACHE_DIR to a writable directory to avoid this.',
+            RuntimeWarning,
+            stacklevel=2,
+        )
+
+    def _read_csv_table(self,
+                        csv_path: pathlib.Path,
+                        index_cols: list,
+                        zfill: int = None,
+                        geoid: bool = False) -> pd.DataFrame:
+        """Parse a reference table CSV into a dataframe
+
+        If geoid is True, the state/county/tract index columns are replaced
+        by a single sorted int64 "geoid" index (see _pack_geoids()).
+        """
+        # Beware ... some NA values like "NAN" are names
+        df = pd.read_csv(
+            csv_path,
             na_values=[''],
             keep_default_na=False,
+            dtype={col: str for col in index_cols},
         )
-        return prob_first_name_given_race
+        # Convert geocode zip codes to 00000-formatted strings
+        if zfill is not None:
+            for col in index_cols:
+                df[col] = df[col].str.zfill(zfill)
+        if geoid:
+            geoids = self._pack_geoids(df[index_cols])
+            if (geoids == _GEOID_MISS).any():
+                raise SurgeoException(f'Malformed tract codes in {csv_path}.')
+            df = df.drop(columns=index_cols)
+            df.index = pd.Index(geoids, name='geoid')
+            return df.sort_index()
+        return df.set_index(index_cols)
+
+    def _read_compiled(self,
+                       compiled_path: pathlib.Path,
+                       csv_path: pathlib.Path) -> pd.DataFrame:
+        """Memory-map a compiled reference table, checking it against its CSV
+
+        The CSV is only hashed if its size or modification time differ from
+        those recorded at compile time. The probabilities (and integer keys)
+        are read-only maps of the .npy files, so nothing is read from disk
+        until rows are used; string keys are read to build the index.
+        """
+        with open(compiled_path / 'meta.json') as f:
+            meta = json.load(f)
+        if meta['version'] != _COMPILED_VERSION:
+            raise ValueError(f'Compiled table at {compiled_path} is stale.')
+        csv_stat = csv_path.stat()
+        unchanged = (
+            meta['size'] == csv_stat.st_size and
+            meta['mtime_ns'] == csv_stat.st_mtime_ns
+        )
+        if not unchanged and meta['sha256'] != self._hash_file(csv_path):
+            raise ValueError(f'Compiled table at {compiled_path} is stale.')
+        values = np.load(
+            compiled_path / 'values.npy',
+            mmap_mode='r',
+            allow_pickle=False,
+        )
+        levels = [
+            np.load(
+                compiled_path / f'index_{i}.npy',
+                mmap_mode='r',
+                allow_pickle=False,
+            )
+            for i in range(len(meta['index']))
+        ]
+        if len(levels) == 1:
+            index = pd.Index(levels[0], name=meta['index'][0], copy=False)
+        else:
+            index = pd.MultiIndex.from_arrays(levels, names=meta['index'])
+        return pd.DataFrame(
+            values,
+            index=index,
+            columns=meta['columns'],
+            copy=False,
+        )
+
+    def _write_compiled(self,
+                        df: pd.DataFrame,
+                        compiled_path: pathlib.Path,
+                        csv_path: pathlib.Path):
+        """Store a reference table as .npy arrays plus a JSON header"""
+        index = df.index.to_frame(index=False)
+        # Only all-float tables with complete string keys can be compiled
+        if index.isna().any().any():
+            raise ValueError('Reference table keys contain missing values.')
+        values = df.to_numpy(dtype=np.float64)
+        compiled_path.mkdir(parents=True, exist_ok=True)
+        arrays = {'values.npy': values}
+        for i, col in enumerate(index.columns):
+            if index[col].dtype.kind in 'iu':
+                arrays[f'index_{i}.npy'] = index[col].to_numpy()
+            else:
+                arrays[f'index_{i}.npy'] = index[col].to_numpy(dtype=str)
+        # Write to temporary names and swap in so readers never see halves;
+        # the header is written last and marks the table as complete.
+        for name, array in arrays.items():
+            temp_path = compiled_path / f'{name}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(temp_path, compiled_path / name)
+        csv_stat = csv_path.stat()
+        meta = {
+            'version': _COMPILED_VERSION,
+            'sha256': self._hash_file(csv_path),
+            'size': csv_stat.st_size,
+            'mtime_ns': csv_stat.st_mtime_ns,
+            'index': list(index.columns),
+            'columns': list(df.columns),
+        }
+        temp_path = compiled_path / f'meta.json.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, compiled_path / 'meta.json')
+
+    def _hash_file(self, path: pathlib.Path) -> str:
+        """Get the SHA-256 hex digest of a file's contents"""
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    def _factorize(self, values: pd.Series) -> tuple:
+        """Split values into integer codes and a series of unique values
+
+        Missing values get a code of their own, pointing at a missing value
+        appended to the uniques, so that whatever is done to the uniques
+        treats them as it would in the full column. The result for each
+        row is then recovered with `result_for_uniques.take(codes)`.
+        """
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Series(uniques)
+        is_missing = codes < 0
+        if is_missing.any():
+            first_missing = pd.Series(values).iloc[[is_missing.argmax()]]
+            uniques = pd.concat([uniques, first_missing], ignore_index=True)
+            codes = np.where(is_missing, len(uniques) - 1, codes)
+        return codes, uniques
+
+    def _dedup_rows(self, *inputs) -> tuple:
+        """Find the distinct rows across several aligned inputs
+
+        Each input is an array, series, or dataframe of the same length
+        (e.g. the keys from _name_keys() and _zcta_keys()). Returns a code for each row, naming its distinct
+        row, and the position of the first occurrence of each distinct
+        row, so that `scored_distinct_rows.iloc[codes]` expands results.
+        """
+        keys = np.zeros(len(inputs[0]), dtype=np.int64)
+        for values in inputs:
+            if isinstance(values, pd.DataFrame):
+                columns = [values[col] for col in values.columns]
+            else:
+                columns = [values]
+            for column in columns:
+                # Missing values (-1) become a code of their own
+                codes, uniques = pd.factorize(column)
+                keys = keys * (len(uniques) + 1) + (codes + 1)
+                # Renumber so that the keys cannot overflow
+                keys, _ = pd.factorize(keys)
+        distinct_count = keys.max() + 1 if len(keys) else 0
+        first_positions = np.empty(distinct_count, dtype=np.int64)
+        # Writing in reverse leaves the earliest position of each key
+        first_positions[keys[::-1]] = np.arange(len(keys))[::-1]
+        return keys, first_positions
+
+    def _posterior(self,
+                   *factors: np.ndarray,
+                   out: np.ndarray = None) -> np.ndarray:
+        """Multiply aligned probability arrays and normalize each row
+
+        This is the Bayesian update shared by BISG and BIFSG. The product
+        is built in place in `out` (allocated in the factors' dtype if not
+        given, and which may be the first factor itself) and then each row
+        is divided by its sum. As with pandas, missing elements are
+        skipped in the sum, so they stay NaN while the rest of the row is
+        normalized; a row with nothing to sum (or a zero sum) is all NaN.
+        """
+        if out is None:
+            out = np.empty(factors[0].shape, dtype=np.result_type(*factors))
+        if out is not factors[0]:
+            np.copyto(out, factors[0])
+        for factor in factors[1:]:
+            np.multiply(out, factor, out=out)
+        denominator = np.nansum(out, axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(out, denominator, out=out)
+        return out
+
+    def _compact_values(self, values: np.ndarray) -> tuple:
+        """Reduce posterior rows to the most likely race and its probability
+
+        Missing elements count as zero. Returns each row's race position
+        (-1 where the whole row is missing), its probability, and how far
+        it is ahead of the runner-up, the latter two as float32 (NaN where
+        the whole row is missing).
+        """
+        missing = np.isnan(values)
+        empty = missing.all(axis=1)
+        filled = np.where(missing, 0, values)
+        codes = filled.argmax(axis=1).astype(np.int8)
+        codes[empty] = -1
+        # The last two columns hold each row's runner-up and maximum
+        top_two = np.partition(filled, -2, axis=1)[:, -2:]
+        best = top_two[:, 1].astype(np.float32)
+        margins = (top_two[:, 1] - top_two[:, 0]).astype(np.float32)
+        best[empty] = np.nan
+        margins[empty] = np.nan
+        return codes, best, margins
+
+    def _compact_frame(self,
+                       values: np.ndarray,
+                       race_columns: pd.Index,
+                       index: pd.Index,
+                       margin: bool = False) -> pd.DataFrame:
+        """Build the race/probability(/margin) columns of compact output"""
+        codes, best, margins = self._compact_values(values)
+        compact_probs = pd.DataFrame(
+            {
+                'race': pd.Categorical.from_codes(codes, race_columns),
+                'probability': best,
+            },
+            index=index,
+        )
+        if margin:
+            compact_probs['margin'] = margins
+        return compact_probs
+
+    def _compact_dict(self,
+                      values: np.ndarray,
+                      race_columns: list,
+                      margin: bool = False) -> dict:
+        """Build the race/probability(/margin) items of a compact record"""
+        codes, best, margins = self._compact_values(values[None])
+        compact_probs = {
+            'race': race_columns[codes[0]] if codes[0] >= 0 else None,
+            'probability': best[0].item(),
+        }
+        if margin:
+            compact_probs['margin'] = margins[0].item()
+        return compact_probs
+
+    def _name_keys(self, names: pd.Series) -> np.ndarray:
+        """Number each row by its normalized name, as _join_names() sees it"""
+        codes, uniques = self._factorize(names)
+        keys, _ = pd.factorize(self._normalize_unique_names(uniques))
+        return keys.take(codes)
+
+    def _zcta_keys(self, zctas: pd.Series) -> np.ndarray:
+        """Number each row by its normalized ZCTA, as _join_zctas() sees it"""
+        codes, uniques = self._factorize(zctas)
+        keys, _ = pd.factorize(self._normalize_zctas(uniques))
+        return keys.take(codes)
+
+    def _tract_keys(self, geo_df: pd.DataFrame) -> np.ndarray:
+        """Get each row's packed GEOID, as _join_tracts() looks it up"""
+        return self._pack_geoids(self._normalize_tracts(geo_df))
+
+    def _take_rows(self, table: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+        """Gather table rows by position, with NaNs wherever rows is -1"""
+        found = rows >= 0
+        # Misses take row 0 and are then blanked out
+        values = np.take(table.to_numpy(), np.where(found, rows, 0), axis=0)
+        values[~found] = np.nan
+        return values
 
     def _normalize_names(self, names: pd.Series) -> pd.Series:
         """Take names and run a normalization routine"""
-        # Make a transalation table of unwanted characers
-        unwanted_characters = (
-            string.digits +
-            string.punctuation +
-            string.whitespace
-        )
-        # Remove unwanted characters efficiently
-        translation_table =  str.maketrans('', '', unwanted_characters)
-        # Run our string operations (remember NAN is a valid name)
-        output = (
-            names.fillna('')
-                 .astype(str)
-                 .str.translate(translation_table)
-                 .str.upper()
-                 .str.replace(r'\s?J\.*?R\.*\s*?$', '', regex=True)
-                 .str.replace(r'\s?S\.*?R\.*\s*?$', '', regex=True)
-                 .str.replace(r'\s?III\s*?$',      '', regex=True)
-                 .str.replace(r'\s?IV\s*?$',       '', regex=True)
-        )
-        output.name = 'name'
+        codes, uniques = self._factorize(names)
+        output = pd.Series(
+            self._normalize_unique_names(uniques).take(codes),
+            index=names.index,
+            dtype=str,
+            name='name',
+        )
         return output
 
+    def _normalize_unique_names(self, uniques: pd.Series) -> np.ndarray:
+        """Normalize factorized names, giving an object array of strings"""
+        # Run our string operations (remember NAN is a valid name)
+        strings = uniques.fillna('').astype(str)
+        return np.array(
+            [_normalize_name(name) for name in strings.to_numpy()],
+            dtype=object,
+        )
+
+    def _join_names(self,
+                    names: pd.Series,
+                    table: pd.DataFrame) -> pd.DataFrame:
+        """Normalize names and attach their rows from a name-keyed table
+
+        This is equivalent to a left merge on the normalized names, but
+        both the normalization and the index lookup only run once per
+        distinct input value; rows are then filled in through the codes.
+        """
+        codes, uniques = self._factorize(names)
+        normalized_uniques = self._normalize_unique_names(uniques)
+        unique_rows = table.index.get_indexer(normalized_uniques)
+        name_probs = pd.DataFrame(
+            self._take_rows(table, unique_rows.take(codes)),
+            index=names.index,
+            columns=table.columns,
+        )
+        name_probs.insert(
+            0,
+            'name',
+            pd.Series(
+                normalized_uniques.take(codes),
+                index=names.index,
+                dtype=str,
+            ),
+        )
+        return name_probs
+
+    def _scalar_table(self, table_attribute: str, columns=None) -> tuple:
+        """Get (values, key to row dict, columns) of a table for score_one()
+
+        These are built from the table attribute on first use and kept on
+        the model. If columns are given, values holds just those columns in
+        that order.
+        """
+        scalar_tables = self.__dict__.setdefault('_scalar_tables', {})
+        if table_attribute not in scalar_tables:
+            table = getattr(self, table_attribute)
+            if columns is not None:
+                table = table[columns]
+            rows = dict(zip(table.index.tolist(), range(len(table))))
+            scalar_tables[table_attribute] = (
+                table.to_numpy(),
+                rows,
+                list(table.columns),
+            )
+        return scalar_tables[table_attribute]
+
+    def _scalar_row(self, values: np.ndarray, rows: dict, key) -> np.ndarray:
+        """Get the table row for one key (all NaN if it is not a key)"""
+        row = rows.get(key, -1)
+        if row < 0:
+            return np.full(values.shape[1], np.nan, dtype=values.dtype)
+        return values[row]
+
+    def _normalize_scalar_name(self, name) -> str:
+        """Normalize one name as _normalize_names() would"""
+        if pd.isna(name):
+            return ''
+        return _normalize_name(str(name))
+
+    def _normalize_scalar_zcta(self, zcta):
+        """Normalize one ZCTA as _normalize_zctas() would (NaN if missing)"""
+        if pd.isna(zcta):
+            return np.nan
+        return str(zcta).strip().zfill(5)
+
+    def _parse_scalar_digits(self, value, width: int) -> int:
+        """Parse one code as _parse_digits() would (-1 if malformed)"""
+        if isinstance(value, str):
+            if 0 < len(value) <= width and value.isascii() and value.isdigit():
+                return int(value)
+            return -1
+        if isinstance(value, (bool, np.bool_)):
+            return -1
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return -1
+        if 0 <= number < 10 ** width and number == math.floor(number):
+            return int(number)
+        return -1
+
+    def _pack_scalar_geoid(self, state, county, tract) -> int:
+        """Pack one state/county/tract as _pack_geoids() would"""
+        geoid = 0
+        for value, width in zip((state, county, tract), _GEOID_WIDTHS):
+            part = self._parse_scalar_digits(value, width)
+            if part < 0:
+                return _GEOID_MISS
+            geoid = geoid * 10 ** width + part
+        return geoid
+
     def _normalize_zctas(self, zcta: pd.Series) -> pd.Series:
         """Transform ZCTAs into standardized strings"""
         converted = pd.Series(zcta.values, dtype=str).str.strip()
@@ -157,7 +938,141 @@ class BaseModel(object):
         zfilled.name = 'zcta5'
         return zfilled
 
+    def _parse_digits(self, values: pd.Series, width: int) -> np.ndarray:
+        """Parse codes of up to width digits into int64s (-1 if malformed)
+
+        Integers (and whole floats) are range checked. Anything else is
+        treated as text, which must be one to width ASCII digits. The text
+        is parsed by viewing its characters as code points rather than
+        through a per-string conversion.
+        """
+        if values.dtype.kind in 'iuf':
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            with np.errstate(invalid='ignore'):
+                is_valid = (
+                    (numbers >= 0) &
+                    (numbers < 10 ** width) &
+                    (numbers == np.floor(numbers))
+                )
+            codes = np.where(is_valid, numbers, -1).astype(np.int64)
+        else:
+            # One extra character catches text that is too long
+            characters = (
+                values.to_numpy(dtype=object)
+                      .astype(f'U{width + 1}')
+                      .view(np.uint32)
+                      .reshape(-1, width + 1)
+                      .astype(np.int64)
+            )
+            is_char = characters != 0
+            digits = characters - ord('0')
+            is_digit = (digits >= 0) & (digits <= 9)
+            is_valid = (
+                (is_digit == is_char).all(axis=1) &
+                is_char[:, 0] &
+                ~is_char[:, width]
+            )
+            # Strings are zero-padded on the right, so skip the padding
+            codes = np.zeros(len(values), dtype=np.int64)
+            for i in range(width):
+                codes = np.where(is_char[:, i], codes * 10 + digits[:, i], codes)
+            codes[~is_valid] = -1
+        return codes
+
+    def _zcta_codes(self,
+                    zctas: pd.Series,
+                    normalized_zctas: pd.Series) -> np.ndarray:
+        """Get integer ZCTAs, with _ZCTA_MISS for anything unmatchable
+
+        This agrees with the string normalization: integer input is used
+        as-is, while other input only counts if its normalized string is
+        exactly five ASCII digits.
+        """
+        if zctas.dtype.kind in 'iu':
+            codes = self._parse_digits(zctas, 5)
+        else:
+            codes = self._parse_digits(normalized_zctas, 5)
+        codes[codes < 0] = _ZCTA_MISS
+        return codes
+
+    def _build_zcta_offsets(self, table: pd.DataFrame) -> np.ndarray:
+        """Create a dense array giving the table row of each ZCTA (or -1)"""
+        offsets = np.full(_ZCTA_SLOTS + 1, -1, dtype=np.int32)
+        keys = table.index.to_numpy().astype(np.int64)
+        offsets[keys] = np.arange(len(table), dtype=np.int32)
+        return offsets
+
+    def _join_zctas(self,
+                    zctas: pd.Series,
+                    table: pd.DataFrame,
+                    offsets: np.ndarray) -> pd.DataFrame:
+        """Normalize ZCTAs and attach their rows from a ZCTA-keyed table
+
+        This is equivalent to a left merge on the "zcta5" strings, but
+        resolves each distinct ZCTA with a direct-address lookup (np.take)
+        into the dense offsets array made by _build_zcta_offsets() and
+        then fills in the rows through the factorized codes.
+        """
+        codes, uniques = self._factorize(zctas)
+        normalized_uniques = self._normalize_zctas(uniques)
+        unique_rows = np.take(
+            offsets,
+            self._zcta_codes(uniques, normalized_uniques),
+        )
+        zcta_probs = pd.DataFrame(
+            self._take_rows(table, unique_rows.take(codes)),
+            columns=table.columns,
+        )
+        zcta_probs.insert(0, 'zcta5', normalized_uniques.take(codes).values)
+        return zcta_probs
+
     def _normalize_tracts(self, geo_target_df: pd.DataFrame) -> pd.DataFrame:
         """Transform rename the columns to standard into standardized strings"""
         converted = geo_target_df.rename(columns={old_col:new_col for old_col, new_col in zip(geo_target_df.columns, ['state','county','tract'])})
         return converted
+
+    def _pack_geoids(self, tracts: pd.DataFrame) -> np.ndarray:
+        """Pack state/county/tract columns into int64 GEOIDs
+
+        Each column may hold digit strings ("01") or numbers (1). A row
+        where any part is malformed or too wide gets _GEOID_MISS.
+        """
+        geoids = np.zeros(len(tracts), dtype=np.int64)
+        is_valid = np.ones(len(tracts), dtype=bool)
+        for col, width in zip(_GEOID_COLUMNS, _GEOID_WIDTHS):
+            # Parse each distinct code once
+            codes, uniques = self._factorize(tracts[col])
+            part = self._parse_digits(uniques, width).take(codes)
+            is_valid &= part >= 0
+            geoids = geoids * 10 ** width + part
+        geoids[~is_valid] = _GEOID_MISS
+        return geoids
+
+    def _join_tracts(self,
+                     geo_df: pd.DataFrame,
+                     table: pd.DataFrame) -> pd.DataFrame:
+        """Normalize tracts and attach their rows from a GEOID-keyed table
+
+        Input columns are renamed to state/county/tract and kept as they
+        are; the lookup packs them into GEOIDs and binary searches the
+        sorted table index.
+        """
+        normalized_tracts = self._normalize_tracts(geo_df)
+        codes, unique_geoids = pd.factorize(
+            self._pack_geoids(normalized_tracts)
+        )
+        # Binary search each distinct GEOID once
+        table_geoids = table.index.to_numpy()
+        unique_rows = np.searchsorted(table_geoids, unique_geoids)
+        unique_rows = np.minimum(unique_rows, len(table_geoids) - 1)
+        is_found = (
+            (table_geoids[unique_rows] == unique_geoids) &
+            (unique_geoids != _GEOID_MISS)
+        )
+        unique_rows[~is_found] = -1
+        tract_probs = pd.DataFrame(
+            self._take_rows(table, unique_rows.take(codes)),
+            index=normalized_tracts.index,
+            columns=table.columns,
+        )
+        return pd.concat([normalized_tracts, tract_probs], axis=1)
@@ -1,5 +1,8 @@
 """Module containing Surgeo BIFSG class"""
 
+from functools import cached_property
+
+import numpy as np
 import pandas as pd
 
 from surgeo.models.base_model import BaseModel
@@ -12,7 +15,7 @@ class BIFSGModel(BaseModel):
     This class:
 
     1. Loads the appropriate first name, surname, and geocode lookup dataframes
-       upon instantiation;
+       upon first use (or when load() is called);
     2. Exposes a public get_probabilities() function to compute race
        probabilities based on proxy data (namely first names, surnames and
        ZIP codes); and,
@@ -45,6 +48,17 @@ class BIFSGModel(BaseModel):
     The manner in which the geography data file was created can be found in
     the "fetch_geography" Jupyter notebook.
 
+    If the model is created with `dedup=True`, each distinct combination
+    of normalized first name, surname, and ZCTA is scored once and the
+    results are expanded back to every row. After each call to get_probabilities(),
+    the `dedup_ratio` attribute holds the number of input rows per
+    distinct combination.
+
+    If the model is created with `compact=True`, the six probability
+    columns are replaced by `race` (the most likely race as a categorical)
+    and `probability` (its float32 posterior), plus a float32 `margin` over
+    the runner-up if `margin=True`, as described for the SurgeoModel.
+
     This is based of the following general formula from Voicu [#]_.
 
     | :math:`q(r \mid s,f,g) = \Large \frac{u(r,s,f,g)}{u(1,s,f,g) \, + \, u(2,s,f,g) \, + \, u(3,s,f,g) \, + \, u(4,s,f,g) \, + \, u(5,s,f,g) \, + \, u(6,s,f,g)}`
@@ -79,11 +93,42 @@ class BIFSGModel(BaseModel):
         `<https://www.tandfonline.com/doi/full/10.1080/2330443X.2018.1427012>`_
 
     """
-    def __init__(self):
-        super().__init__()
-        self._PROB_ZCTA_GIVEN_RACE = self._get_prob_zcta_given_race()
-        self._PROB_RACE_GIVEN_SURNAME = self._get_prob_race_given_surname()
-        self._PROB_FIRST_NAME_GIVEN_RACE = self._get_prob_first_name_given_race()
+    _TABLE_ATTRIBUTES = (
+        '_PROB_ZCTA_GIVEN_RACE',
+        '_PROB_RACE_GIVEN_SURNAME',
+        '_PROB_FIRST_NAME_GIVEN_RACE',
+    )
+
+    def __init__(self,
+                 dedup=False,
+                 dtype=np.float64,
+                 compact=False,
+                 margin=False):
+        super().__init__(dtype=dtype)
+        self.dedup = dedup
+        self.dedup_ratio = None
+        self.compact = compact
+        self.margin = margin
+
+    @cached_property
+    def _PROB_ZCTA_GIVEN_RACE(self):
+        """ZCTA ratios given race (loaded on first use)"""
+        return self._get_prob_zcta_given_race()
+
+    @cached_property
+    def _ZCTA_OFFSETS(self):
+        """Table row of each ZCTA (built on first ZCTA lookup)"""
+        return self._build_zcta_offsets(self._PROB_ZCTA_GIVEN_RACE)
+
+    @cached_property
+    def _PROB_RACE_GIVEN_SURNAME(self):
+        """Race probabilities given surname (loaded on first use)"""
+        return self._get_prob_race_given_surname()
+
+    @cached_property
+    def _PROB_FIRST_NAME_GIVEN_RACE(self):
+        """First name ratios given race (loaded on first use)"""
+        return self._get_prob_first_name_given_race()
 
     def get_probabilities(self, first_names, surnames, zctas):
         """Obtain a set of BIFSG probabilities for first_name/surname/ZCTA
@@ -110,12 +155,30 @@ class BIFSGModel(BaseModel):
         Returns
         -------
         pd.DataFrame
-            Dataframe of BIFSG probability results
+            Dataframe of BIFSG probability results, with the index of
+            first_names
 
         """
 
         # Check inputs
         self._check_inputs(first_names, surnames, zctas)
+        # The component models line rows up by position from zero
+        index = first_names.index
+        first_names = first_names.reset_index(drop=True)
+        surnames = surnames.reset_index(drop=True)
+        zctas = zctas.reset_index(drop=True)
+        # Only score each distinct normalized name/name/ZCTA tuple if
+        # deduplicating
+        if self.dedup:
+            codes, first_positions = self._dedup_rows(
+                self._name_keys(first_names),
+                self._name_keys(surnames),
+                self._zcta_keys(zctas),
+            )
+            self.dedup_ratio = len(codes) / max(len(first_positions), 1)
+            first_names = first_names.iloc[first_positions].reset_index(drop=True)
+            surnames = surnames.iloc[first_positions].reset_index(drop=True)
+            zctas = zctas.iloc[first_positions].reset_index(drop=True)
         # Get component probabilities
         first_name_probs = self._get_first_name_probs(first_names)
         sur_probs = self._get_surname_probs(surnames)
@@ -133,6 +196,66 @@ class BIFSGModel(BaseModel):
             geo_probs,
             bifsg_probs,
         )
+        # Expand the distinct results back out to every input row
+        if self.dedup:
+            result = result.iloc[codes]
+        # Give the rows back the index of the caller's first names
+        result.index = index
+        return result
+
+    def score_one(self, first_name, surname, zcta) -> dict:
+        """Obtain BIFSG probabilities for a single first name/surname/ZCTA
+
+        This gives the same values as a one-row get_probabilities() call
+        but uses plain dict and array lookups and a single posterior
+        calculation, so it suits scoring one record at a time.
+
+        Parameters
+        ----------
+        first_name : str
+            The first name to use for the BIFSG algorithm
+        surname : str
+            The surname to use for the BIFSG algorithm
+        zcta : Union[str, int]
+            The ZIP/ZCTA code for the BIFSG algorithm
+
+        Returns
+        -------
+        dict
+            The normalized inputs and their BIFSG probabilities
+
+        """
+        sur_values, sur_rows, race_columns = self._scalar_table(
+            '_PROB_RACE_GIVEN_SURNAME',
+        )
+        first_values, first_rows, _ = self._scalar_table(
+            '_PROB_FIRST_NAME_GIVEN_RACE',
+            race_columns,
+        )
+        geo_values, geo_rows, _ = self._scalar_table(
+            '_PROB_ZCTA_GIVEN_RACE',
+            race_columns,
+        )
+        # Look up each component's row
+        first_name = self._normalize_scalar_name(first_name)
+        surname = self._normalize_scalar_name(surname)
+        zcta = self._normalize_scalar_zcta(zcta)
+        first_name_probs = self._scalar_row(first_values, first_rows, first_name)
+        sur_probs = self._scalar_row(sur_values, sur_rows, surname)
+        geo_probs = self._scalar_row(geo_values, geo_rows, zcta)
+        # Run BIFSG algorithm on the single row
+        bifsg_probs = self._posterior(
+            first_name_probs[None],
+            sur_probs[None],
+            geo_probs[None],
+        )[0]
+        result = {'zcta5': zcta, 'first_name': first_name, 'surname': surname}
+        if self.compact:
+            result.update(
+                self._compact_dict(bifsg_probs, race_columns, self.margin)
+            )
+        else:
+            result.update(zip(race_columns, bifsg_probs.tolist()))
         return result
 
     def _combined_probs(self,
@@ -140,16 +263,33 @@ class BIFSGModel(BaseModel):
                         sur_probs: pd.DataFrame,
                         geo_probs: pd.DataFrame) -> pd.DataFrame:
         """Performs the BIFSG calculation"""
-        # Calculate each of the numerators
-        bifsg_numer = (
-            first_name_probs.iloc[:, 1:] *
-            sur_probs.iloc[:, 1:] *
-            geo_probs.iloc[:, 1:]
+        # Line up the race columns of each input as plain arrays
+        race_columns = self._PROB_RACE_GIVEN_SURNAME.columns
+        # The first name copy is fresh, so it doubles as the output buffer
+        first_name_values = first_name_probs[race_columns].to_numpy(
+            dtype=self.dtype,
+            copy=True,
+        )
+        # Calculate each numerator and divide by the row's denominator
+        bifsg_values = self._posterior(
+            first_name_values,
+            sur_probs[race_columns].to_numpy(dtype=self.dtype),
+            geo_probs[race_columns].to_numpy(dtype=self.dtype),
+            out=first_name_values,
+        )
+        # Keep only the most likely race if compact output was requested
+        if self.compact:
+            return self._compact_frame(
+                bifsg_values,
+                race_columns,
+                sur_probs.index,
+                self.margin,
+            )
+        bifsg_probs = pd.DataFrame(
+            bifsg_values,
+            index=sur_probs.index,
+            columns=race_columns,
         )
-        # Calculate the denominator
-        bifsg_denom = bifsg_numer.sum(axis=1)
-        # Caluclate the bifsg probabilities (each num / denom)
-        bifsg_probs = bifsg_numer.div(bifsg_denom, axis=0)
         return bifsg_probs
 
     def _adjust_frame(self,
@@ -188,48 +328,28 @@ class BIFSGModel(BaseModel):
 
     def _get_first_name_probs(self, first_names: pd.Series) -> pd.DataFrame:
         """Normalizes ZCTAs/ZIPs and joins them to their race probs."""
-        # Normalize
-        normalized_first_names = (
-            self._normalize_names(first_names)
-                .to_frame()
-        )
-        # Merge names to dataframe, which gives probs for each name.
-        first_name_probs = normalized_first_names.merge(
+        # Normalize names and join them, which gives probs for each name.
+        first_name_probs = self._join_names(
+            first_names,
             self._PROB_FIRST_NAME_GIVEN_RACE,
-            left_on='name',
-            right_index=True,
-            how='left',
         )
         return first_name_probs
 
     def _get_surname_probs(self, surnames: pd.Series) -> pd.DataFrame:
         """Normalizes names and joins names to their race probabilities."""
-        # Normalize names
-        normalized_names = (
-            self._normalize_names(surnames)
-                .to_frame()
-        )
-        # Merge names to dataframe, which gives probs for each name
-        surname_probs = normalized_names.merge(
+        # Normalize names and join them, which gives probs for each name
+        surname_probs = self._join_names(
+            surnames,
             self._PROB_RACE_GIVEN_SURNAME,
-            left_on='name',
-            right_index=True,
-            how='left',
         )
         return surname_probs
 
     def _get_geocode_probs(self, zctas: pd.Series) -> pd.DataFrame:
         """Normalizes ZCTAs/ZIPs and joins them to their race probs."""
-        # Normalize
-        normalized_zctas = (
-            self._normalize_zctas(zctas)
-                .to_frame()
-        )
-        # Merge names to dataframe, which gives probs for each name.
-        geocode_probs = normalized_zctas.merge(
+        # Normalize and look up each ZCTA's row directly
+        geocode_probs = self._join_zctas(
+            zctas,
             self._PROB_ZCTA_GIVEN_RACE,
-            left_on='zcta5',
-            right_index=True,
-            how='left',
+            self._ZCTA_OFFSETS,
         )
         return geocode_probs
@@ -1,5 +1,7 @@
 """Module containing the FirstNameModel class."""
 
+from functools import cached_property
+
 import pandas as pd
 
 from surgeo.models.base_model import BaseModel
@@ -22,9 +24,12 @@ class FirstNameModel(BaseModel):
 
     """
 
-    def __init__(self):
-        super().__init__()
-        self._PROB_RACE_GIVEN_FIRST_NAME = self._get_prob_race_given_first_name()
+    _TABLE_ATTRIBUTES = ('_PROB_RACE_GIVEN_FIRST_NAME',)
+
+    @cached_property
+    def _PROB_RACE_GIVEN_FIRST_NAME(self):
+        """Race probabilities given first name (loaded on first use)"""
+        return self._get_prob_race_given_first_name()
 
     def get_probabilities(self, names):
         """Obtain race probabilities for a set of first names.
@@ -41,18 +46,37 @@ class FirstNameModel(BaseModel):
 
         """
 
-        # Clean and process names (consistent with Word et al)
-        normalized_names = (
-            self._normalize_names(names)
-                .to_frame()
-        )
-        # Do a simple join to obtain the names along with provs.
-        first_name_probs = normalized_names.merge(
+        # Clean and process names (consistent with Word et al) and do a
+        # simple join to obtain the names along with probs.
+        first_name_probs = self._join_names(
+            names,
             self._PROB_RACE_GIVEN_FIRST_NAME,
-            left_on='name',
-            right_index=True,
-            how='left',
         )
         # Rename to avoid clashes with "name"
         first_name_probs = first_name_probs.rename(columns={'name': 'first_name'})
         return first_name_probs
+
+    def score_one(self, name) -> dict:
+        """Obtain race probabilities for a single first name.
+
+        This gives the same values as a one-row get_probabilities() call
+        but uses plain dict and array lookups, so it suits scoring one
+        record at a time.
+
+        Parameters
+        ----------
+        name : str
+            name to which to attach race probability data
+
+        Return
+        ------
+        dict
+            The normalized first name and its race probabilities
+
+        """
+        values, rows, columns = self._scalar_table(
+            '_PROB_RACE_GIVEN_FIRST_NAME',
+        )
+        name = self._normalize_scalar_name(name)
+        probs = self._scalar_row(values, rows, name)
+        return {'first_name': name, **dict(zip(columns, probs.tolist()))}
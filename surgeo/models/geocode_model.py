@@ -1,5 +1,8 @@
 """This module contains the GeocodeModel class"""
 
+from functools import cached_property
+
+import numpy as np
 import pandas as pd
 
 from surgeo.models.base_model import BaseModel
@@ -30,12 +33,24 @@ class GeocodeModel(BaseModel):
 
     """
 
-    def __init__(self, geo_level='ZCTA'):
-        super().__init__()
-        if geo_level.upper() == 'TRACT':
-            self._PROB_RACE_GIVEN_GEO = self._get_prob_race_given_tract()
+    _TABLE_ATTRIBUTES = ('_PROB_RACE_GIVEN_GEO',)
+
+    def __init__(self, geo_level='ZCTA', dtype=np.float64):
+        super().__init__(dtype=dtype)
+        self.geo_level = geo_level.upper()
+
+    @cached_property
+    def _PROB_RACE_GIVEN_GEO(self):
+        """Race probabilities given ZCTA or tract (loaded on first use)"""
+        if self.geo_level == 'TRACT':
+            return self._get_prob_race_given_tract()
         else:
-            self._PROB_RACE_GIVEN_GEO = self._get_prob_race_given_zcta()
+            return self._get_prob_race_given_zcta()
+
+    @cached_property
+    def _ZCTA_OFFSETS(self):
+        """Table row of each ZCTA (built on first ZCTA lookup)"""
+        return self._build_zcta_offsets(self._PROB_RACE_GIVEN_GEO)
 
     def get_probabilities(self, zctas):
         """Obtain race probabilities for a set of ZIP codes or ZCTAs.
@@ -52,17 +67,11 @@ class GeocodeModel(BaseModel):
 
         """
 
-        # Clean ZCTAs
-        normalized_zctas = (
-            self._normalize_zctas(zctas)
-                .to_frame()
-        )
-        # Merge ZCTAs to race probabilities
-        geocode_probs = normalized_zctas.merge(
+        # Clean ZCTAs and look up their race probabilities
+        geocode_probs = self._join_zctas(
+            zctas,
             self._PROB_RACE_GIVEN_GEO,
-            left_on='zcta5',
-            right_index=True,
-            how='left',
+            self._ZCTA_OFFSETS,
         )
         return geocode_probs
 
@@ -81,14 +90,59 @@ class GeocodeModel(BaseModel):
 
         """
 
-        normalized_tracts = (
-            self._normalize_tracts(geo_df)
-        )
-        # Merge ZCTAs to race probabilities
-        geocode_probs = normalized_tracts.merge(
-            self._PROB_RACE_GIVEN_GEO,
-            left_on=['state','county','tract'],
-            right_index=True,
-            how='left',
-        )
+        # Normalize tracts and look up their race probabilities by GEOID
+        geocode_probs = self._join_tracts(geo_df, self._PROB_RACE_GIVEN_GEO)
         return geocode_probs
+
+    def score_one(self, zcta) -> dict:
+        """Obtain race probabilities for a single ZIP code or ZCTA.
+
+        This gives the same values as a one-row get_probabilities() call
+        but uses plain dict and array lookups, so it suits scoring one
+        record at a time.
+
+        Parameters
+        ----------
+        zcta : Union[str, int]
+            ZIP/ZCTA to which to attach race probability data
+
+        Return
+        ------
+        dict
+            The normalized ZCTA and its race probabilities
+
+        """
+        values, rows, columns = self._scalar_table('_PROB_RACE_GIVEN_GEO')
+        zcta = self._normalize_scalar_zcta(zcta)
+        probs = self._scalar_row(values, rows, zcta)
+        return {'zcta5': zcta, **dict(zip(columns, probs.tolist()))}
+
+    def score_one_tract(self, state, county, tract) -> dict:
+        """Obtain race probabilities for a single State, County, Tract.
+
+        This is the single record counterpart of get_probabilities_tract().
+
+        Parameters
+        ----------
+        state : Union[str, int]
+            Two digit FIPS state code
+        county : Union[str, int]
+            Three digit FIPS county code
+        tract : Union[str, int]
+            Six digit census tract code
+
+        Return
+        ------
+        dict
+            The state, county, and tract and their race probabilities
+
+        """
+        values, rows, columns = self._scalar_table('_PROB_RACE_GIVEN_GEO')
+        geoid = self._pack_scalar_geoid(state, county, tract)
+        probs = self._scalar_row(values, rows, geoid)
+        return {
+            'state': state,
+            'county': county,
+            'tract': tract,
+            **dict(zip(columns, probs.tolist())),
+        }
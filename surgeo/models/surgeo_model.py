@@ -1,8 +1,11 @@
 """Module containing Surgeo BISG class"""
 
-import pandas as pd
+from functools import cached_property
 from typing import Union
 
+import numpy as np
+import pandas as pd
+
 from surgeo.models.base_model import BaseModel
 from surgeo.utility.surgeo_exception import SurgeoException
 
@@ -13,7 +16,7 @@ class SurgeoModel(BaseModel):
     This class:
 
     1. Loads the appropriate surname and geocode lookup dataframes upon
-       instantiation;
+       first use (or when load() is called);
     2. Exposes a public get_probabilities() function to compute race
        probabilities based on proxy data (namely surnames and ZIP codes); and,
     3. Contains a number of helper functions for cleaning ZCTA/names,
@@ -35,6 +38,22 @@ class SurgeoModel(BaseModel):
     The manner in which the geography data file was created can be found in
     the "fetch_geography" Jupyter notebook.
 
+    If the model is created with `dedup=True`, each distinct pair of
+    normalized surname and geography is scored once and the results are
+    expanded back to every row. This pays off when rows repeat (e.g.
+    household files where whole families share a surname and ZIP, even if
+    written "Smith Jr" and "SMITH" or 631 and "00631"). After each call
+    to get_probabilities(), the `dedup_ratio` attribute holds the number
+    of input rows per distinct pair (e.g. 4.0 means a quarter of the
+    work).
+
+    If the model is created with `compact=True`, the six probability
+    columns are replaced by `race`, the most likely race as a categorical
+    (one byte per row, missing where there is no posterior), and
+    `probability`, its posterior as float32. With `margin=True` as well, a
+    float32 `margin` column holds how far that race is ahead of the
+    runner-up. These are taken straight from the posterior array.
+
     This is based of the following general formula from Elliott et al [#]_.
 
     | :math:`q(i \mid j,k) = \Large \frac{u(i,j,k)}{u(1,j,k) \, + \, u(2,j,k) \, + \, u(3,j,k) \, + \, u(4,j,k) \, + \, u(5,j,k) \, + \, u(6,j,k)}`
@@ -68,14 +87,38 @@ class SurgeoModel(BaseModel):
         69. `<https://link.springer.com/article/10.1007/s10742-009-0047-1>`_
 
     """
-    def __init__(self, geo_level="ZCTA"):
-        super().__init__()
+    _TABLE_ATTRIBUTES = ('_PROB_GEO_GIVEN_RACE', '_PROB_RACE_GIVEN_SURNAME')
+
+    def __init__(self,
+                 geo_level="ZCTA",
+                 dedup=False,
+                 dtype=np.float64,
+                 compact=False,
+                 margin=False):
+        super().__init__(dtype=dtype)
         self.geo_level = geo_level.upper()
-        if geo_level == "TRACT":
-            self._PROB_GEO_GIVEN_RACE = self._get_prob_race_given_tract()
+        self.dedup = dedup
+        self.dedup_ratio = None
+        self.compact = compact
+        self.margin = margin
+
+    @cached_property
+    def _PROB_GEO_GIVEN_RACE(self):
+        """Geography ratios given race (loaded on first use)"""
+        if self.geo_level == 'TRACT':
+            return self._get_prob_race_given_tract()
         else:
-            self._PROB_GEO_GIVEN_RACE = self._get_prob_zcta_given_race()
-        self._PROB_RACE_GIVEN_SURNAME = self._get_prob_race_given_surname()
+            return self._get_prob_zcta_given_race()
+
+    @cached_property
+    def _ZCTA_OFFSETS(self):
+        """Table row of each ZCTA (built on first ZCTA lookup)"""
+        return self._build_zcta_offsets(self._PROB_GEO_GIVEN_RACE)
+
+    @cached_property
+    def _PROB_RACE_GIVEN_SURNAME(self):
+        """Race probabilities given surname (loaded on first use)"""
+        return self._get_prob_race_given_surname()
 
     def get_probabilities(self, names, geo_df):
         """Obtain a set of BISG probabilities for name/ZCTA series
@@ -99,12 +142,31 @@ class SurgeoModel(BaseModel):
         Returns
         -------
         pd.DataFrame
-            Dataframe of BISG probability results
+            Dataframe of BISG probability results, with the index of names
 
         """
 
         # Check inputs
         self._check_inputs(names, geo_df)
+        # The component models line rows up by position from zero
+        index = names.index
+        names = names.reset_index(drop=True)
+        geo_df = geo_df.reset_index(drop=True)
+        # Only score each distinct normalized name/geography pair if
+        # deduplicating
+        if self.dedup:
+            if self.geo_level == 'TRACT':
+                geo_keys = self._tract_keys(geo_df)
+            else:
+                geo_keys = self._zcta_keys(geo_df)
+            codes, first_positions = self._dedup_rows(
+                self._name_keys(names),
+                geo_keys,
+            )
+            input_geo_df = geo_df
+            self.dedup_ratio = len(codes) / max(len(first_positions), 1)
+            names = names.iloc[first_positions].reset_index(drop=True)
+            geo_df = geo_df.iloc[first_positions].reset_index(drop=True)
         # Get component probabilities
         sur_probs = self._get_surname_probs(names)
         geo_probs = self._get_geocode_probs(geo_df)
@@ -116,18 +178,99 @@ class SurgeoModel(BaseModel):
             geo_probs,
             surgeo_probs,
         )
+        # Expand the distinct results back out to every input row
+        if self.dedup:
+            result = result.iloc[codes]
+            # Tract columns echo the inputs, which may be written
+            # differently (e.g. 1 and "01") within a GEOID
+            if self.geo_level == 'TRACT':
+                tracts = self._normalize_tracts(input_geo_df)
+                for col in tracts.columns:
+                    result[col] = tracts[col].array
+        # Give the rows back the index of the caller's names
+        result.index = index
+        return result
+
+    def score_one(self, name, geo) -> dict:
+        """Obtain BISG probabilities for a single name and geography
+
+        This gives the same values as a one-row get_probabilities() call
+        but uses plain dict and array lookups and a single posterior
+        calculation, so it suits scoring one record at a time.
+
+        Parameters
+        ----------
+        name : str
+            The surname to use for the BISG algorithm
+        geo : Union[str, int, tuple]
+            The ZIP/ZCTA code, or a (state, county, tract) tuple if the
+            model was created with geo_level="TRACT"
+
+        Returns
+        -------
+        dict
+            The normalized inputs and their BISG probabilities
+
+        """
+        sur_values, sur_rows, race_columns = self._scalar_table(
+            '_PROB_RACE_GIVEN_SURNAME',
+        )
+        geo_values, geo_rows, _ = self._scalar_table(
+            '_PROB_GEO_GIVEN_RACE',
+            race_columns,
+        )
+        # Look up each component's row
+        name = self._normalize_scalar_name(name)
+        sur_probs = self._scalar_row(sur_values, sur_rows, name)
+        if self.geo_level == 'TRACT':
+            state, county, tract = geo
+            geo_key = self._pack_scalar_geoid(state, county, tract)
+            result = {'state': state, 'county': county, 'tract': tract}
+        else:
+            geo_key = self._normalize_scalar_zcta(geo)
+            result = {'zcta5': geo_key}
+        geo_probs = self._scalar_row(geo_values, geo_rows, geo_key)
+        # Run Surgeo algorithm on the single row
+        surgeo_probs = self._posterior(sur_probs[None], geo_probs[None])[0]
+        result['name'] = name
+        if self.compact:
+            result.update(
+                self._compact_dict(surgeo_probs, race_columns, self.margin)
+            )
+        else:
+            result.update(zip(race_columns, surgeo_probs.tolist()))
         return result
 
     def _combined_probs(self,
                         sur_probs: pd.DataFrame,
                         geo_probs: pd.DataFrame) -> pd.DataFrame:
         """Performs the BISG calculation"""
-        # Calculate each of the numerators
-        surgeo_numer = sur_probs.iloc[:, 1:] * geo_probs.iloc[:, 1:]
-        # Calculate the denominator
-        surgeo_denom = surgeo_numer.sum(axis=1)
-        # Caluclate the surgeo probabilities (each num / denom)
-        surgeo_probs = surgeo_numer.div(surgeo_denom, axis=0)
+        # Line up the race columns of each input as plain arrays
+        race_columns = self._PROB_RACE_GIVEN_SURNAME.columns
+        # The surname copy is fresh, so it doubles as the output buffer
+        sur_values = sur_probs[race_columns].to_numpy(
+            dtype=self.dtype,
+            copy=True,
+        )
+        # Calculate each numerator and divide by the row's denominator
+        surgeo_values = self._posterior(
+            sur_values,
+            geo_probs[race_columns].to_numpy(dtype=self.dtype),
+            out=sur_values,
+        )
+        # Keep only the most likely race if compact output was requested
+        if self.compact:
+            return self._compact_frame(
+                surgeo_values,
+                race_columns,
+                sur_probs.index,
+                self.margin,
+            )
+        surgeo_probs = pd.DataFrame(
+            surgeo_values,
+            index=sur_probs.index,
+            columns=race_columns,
+        )
         return surgeo_probs
 
     def _adjust_frame(self,
@@ -163,17 +306,10 @@ class SurgeoModel(BaseModel):
     def _get_surname_probs(self,
                            names: pd.Series) -> pd.DataFrame:
         """Normalizes names and joins names to their race probabilities."""
-        # Normalize names
-        normalized_names = (
-            self._normalize_names(names)
-                .to_frame()
-        )
-        # Merge names to dataframe, which gives probs for each name
-        surname_probs = normalized_names.merge(
+        # Normalize names and join them, which gives probs for each name
+        surname_probs = self._join_names(
+            names,
             self._PROB_RACE_GIVEN_SURNAME,
-            left_on='name',
-            right_index=True,
-            how='left',
         )
         return surname_probs
 
@@ -181,25 +317,13 @@ class SurgeoModel(BaseModel):
         """Normalizes ZCTAs/ZIPs and joins them to their race probs."""
         # Normalize
         if self.geo_level == 'TRACT':
-            normalized_tracts = (
-                self._normalize_tracts(geo_df)
-            )
-            geocode_probs = normalized_tracts.merge(
-                self._PROB_GEO_GIVEN_RACE,
-                left_on=['state','county','tract'],
-                right_index=True,
-                how='left',
-            )
-        else: 
-            normalized_zctas = (
-                self._normalize_zctas(geo_df)
-                    .to_frame()
-            )
-            # Merge names to dataframe, which gives probs for each name.
-            geocode_probs = normalized_zctas.merge(
+            # Look up each tract's row by its packed GEOID
+            geocode_probs = self._join_tracts(geo_df, self._PROB_GEO_GIVEN_RACE)
+        else:
+            # Look up each ZCTA's row directly, which gives probs for each
+            geocode_probs = self._join_zctas(
+                geo_df,
                 self._PROB_GEO_GIVEN_RACE,
-                left_on='zcta5',
-                right_index=True,
-                how='left',
+                self._ZCTA_OFFSETS,
             )
         return geocode_probs
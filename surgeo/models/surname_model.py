@@ -1,5 +1,7 @@
 """Module containing the SurnameModel class."""
 
+from functools import cached_property
+
 import pandas as pd
 
 from surgeo.models.base_model import BaseModel
@@ -22,9 +24,12 @@ class SurnameModel(BaseModel):
 
     """
 
-    def __init__(self):
-        super().__init__()
-        self._PROB_RACE_GIVEN_SURNAME = self._get_prob_race_given_surname()
+    _TABLE_ATTRIBUTES = ('_PROB_RACE_GIVEN_SURNAME',)
+
+    @cached_property
+    def _PROB_RACE_GIVEN_SURNAME(self):
+        """Race probabilities given surname (loaded on first use)"""
+        return self._get_prob_race_given_surname()
 
     def get_probabilities(self, names):
         """Obtain race probabilities for a set of surnames.
@@ -41,16 +46,33 @@ class SurnameModel(BaseModel):
 
         """
 
-        # Clean and process names (consistent with Word et al)
-        normalized_names = (
-            self._normalize_names(names)
-                .to_frame()
-        )
-        # Do a simple join to obtain the names along with provs.
-        surname_probs = normalized_names.merge(
+        # Clean and process names (consistent with Word et al) and do a
+        # simple join to obtain the names along with probs.
+        surname_probs = self._join_names(
+            names,
             self._PROB_RACE_GIVEN_SURNAME,
-            left_on='name',
-            right_index=True,
-            how='left',
         )
         return surname_probs
+
+    def score_one(self, name) -> dict:
+        """Obtain race probabilities for a single surname.
+
+        This gives the same values as a one-row get_probabilities() call
+        but uses plain dict and array lookups, so it suits scoring one
+        record at a time.
+
+        Parameters
+        ----------
+        name : str
+            name to which to attach race probability data
+
+        Return
+        ------
+        dict
+            The normalized name and its race probabilities
+
+        """
+        values, rows, columns = self._scalar_table('_PROB_RACE_GIVEN_SURNAME')
+        name = self._normalize_scalar_name(name)
+        probs = self._scalar_row(values, rows, name)
+        return {'name': name, **dict(zip(columns, probs.tolist()))}
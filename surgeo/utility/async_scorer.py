@@ -0,0 +1,115 @@
+"""Module containing an asyncio front end for the models."""
+
+import asyncio
+
+import pandas as pd
+
+
+class AsyncScorer(object):
+    """Awaitable scoring that keeps the event loop responsive
+
+    Calling get_probabilities() from a coroutine blocks the event loop for
+    the whole batch. An AsyncScorer wraps a scoring function (e.g.
+    SurgeoModel().get_probabilities), splits each call into chunks of
+    chunksize rows, and runs the chunks on an executor. The event loop is
+    free while a chunk runs, so other coroutines keep being served while a
+    large file is scored.
+
+    At most max_concurrency chunks (across every call to the scorer) run at
+    once, and a call only slices a chunk out of its inputs when it is about
+    to score it. Cancelling a score() call stops any of its chunks that have
+    not started; a chunk that is already running finishes in the background
+    and its result is discarded. The result has the index of the first input.
+
+    Parameters
+    ----------
+    score_function : callable
+        Takes one or more aligned pd.Series/pd.DataFrame arguments and
+        returns a dataframe with one row per input row
+    executor : concurrent.futures.Executor
+        Where the chunks run (default: the event loop's default executor)
+    max_concurrency : int
+        The number of chunks that may run at once
+    chunksize : int
+        The number of rows scored by each executor call
+
+    Example
+    -------
+        .. code-block:: python
+
+            model = surgeo.SurgeoModel()
+            scorer = AsyncScorer(model.get_probabilities, chunksize=50_000)
+
+            async def handle(names, zctas):
+                return await scorer.score(names, zctas)
+
+    """
+
+    def __init__(
+        self,
+        score_function,
+        executor=None,
+        max_concurrency=4,
+        chunksize=10_000,
+    ):
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be a positive integer.')
+        if chunksize < 1:
+            raise ValueError('chunksize must be a positive integer.')
+        self.score_function = score_function
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.chunksize = chunksize
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def score(self, *inputs) -> pd.DataFrame:
+        """Score inputs on the executor without blocking the event loop
+
+        Parameters
+        ----------
+        inputs : Union[pd.Series, pd.DataFrame]
+            The arguments for the scoring function
+
+        Returns
+        -------
+        pd.DataFrame
+            The scoring function's results for the inputs, with the index
+            of the first input
+
+        """
+        starts = range(0, len(inputs[0]), self.chunksize)
+        results = [None] * len(starts)
+        next_chunks = iter(enumerate(starts))
+
+        async def score_next_chunks():
+            # Slice each chunk only when this runner is ready to score it
+            for chunk_number, start in next_chunks:
+                # The models line inputs up by index, so each chunk starts
+                # at zero
+                chunk = [
+                    argument.iloc[start:start + self.chunksize]
+                            .reset_index(drop=True)
+                    for argument in inputs
+                ]
+                results[chunk_number] = await self._score_chunk(chunk)
+
+        runner_count = min(self.max_concurrency, len(starts))
+        await asyncio.gather(
+            *(score_next_chunks() for _ in range(runner_count))
+        )
+        if not results:
+            results = [await self._score_chunk(inputs)]
+        result = pd.concat(results, ignore_index=True)
+        # Give the rows back the index of the caller's inputs
+        result.index = inputs[0].index
+        return result
+
+    async def _score_chunk(self, inputs):
+        """Run the scoring function on one chunk once a slot is free"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor,
+                self.score_function,
+                *inputs,
+            )
@@ -0,0 +1,214 @@
+"""Module reading and writing Parquet, Feather, and Arrow files.
+
+These formats need the optional pyarrow package, which is imported only when
+one of these files is actually read or written.
+"""
+
+import pathlib
+
+import pandas as pd
+
+from surgeo.utility.surgeo_exception import SurgeoException
+
+
+# File endings handled by this module (.feather and .arrow are Arrow IPC)
+COLUMNAR_SUFFIXES = ('.parquet', '.feather', '.arrow')
+
+
+def is_columnar(path) -> bool:
+    """Check whether a path has a Parquet, Feather, or Arrow file ending"""
+    return pathlib.Path(path).suffix in COLUMNAR_SUFFIXES
+
+
+def read_columnar(path, columns=None) -> pd.DataFrame:
+    """Read a Parquet, Feather, or Arrow file into a dataframe
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The file to read
+    columns : list
+        The columns to read (default: all of them). Other columns are never
+        decoded.
+
+    Returns
+    -------
+    pd.DataFrame
+        The file's data with a zero-based index
+
+    """
+    pa, pa_feather, pa_parquet = _import_pyarrow()
+    if pathlib.Path(path).suffix == '.parquet':
+        table = pa_parquet.read_table(str(path), columns=columns)
+    else:
+        table = pa_feather.read_table(
+            str(path),
+            columns=columns,
+            memory_map=True,
+        )
+    return table.to_pandas()
+
+
+def iter_columnar(path, batch_size, columns=None):
+    """Read a Parquet, Feather, or Arrow file in batches
+
+    Parquet files are read a row group at a time and Arrow files a record
+    batch at a time, so memory use depends on batch_size rather than the
+    file size. The file is opened and its columns are checked before this
+    returns, so those errors are raised here rather than while iterating.
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The file to read
+    batch_size : int
+        The most rows in each dataframe
+    columns : list
+        The columns to read (default: all of them)
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        Consecutive slices of the file's data, each with a zero-based index
+
+    Raises
+    ------
+    ValueError
+        Raised if the file is not valid or a listed column is not in it
+
+    """
+    pa, pa_feather, pa_parquet = _import_pyarrow()
+    if pathlib.Path(path).suffix == '.parquet':
+        parquet_file = pa_parquet.ParquetFile(str(path))
+        names = parquet_file.schema_arrow.names
+        batches = parquet_file.iter_batches(batch_size, columns=columns)
+    else:
+        # The map stays open as long as any batch (or dataframe) uses it
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        names = reader.schema.names
+        batches = _iter_ipc_batches(pa, reader, columns)
+    # Parquet would silently leave out a missing column
+    missing = [column for column in columns or () if column not in names]
+    if missing:
+        raise ValueError(
+            'Usecols do not match columns, columns expected but not '
+            f'found: {missing}'
+        )
+    return _iter_batches(batches, batch_size)
+
+
+class ColumnarWriter(object):
+    """Writes dataframes to one Parquet, Feather, or Arrow file in pieces
+
+    Each dataframe passed to write() becomes a Parquet row group or an
+    Arrow record batch. The first dataframe fixes the schema, so a later
+    column with only missing values keeps its type.
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The file to write
+
+    Example
+    -------
+        .. code-block:: python
+
+            with ColumnarWriter('output.parquet') as writer:
+                for df in dfs:
+                    writer.write(df)
+
+    """
+
+    def __init__(self, path):
+        self._pa, self._pa_feather, self._pa_parquet = _import_pyarrow()
+        self.path = pathlib.Path(path)
+        self._schema = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, df):
+        """Append a dataframe to the file
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The rows to append (the index is not written)
+
+        """
+        table = self._pa.Table.from_pandas(
+            df,
+            schema=self._schema,
+            preserve_index=False,
+        )
+        if self._writer is None:
+            self._schema = table.schema
+            if self.path.suffix == '.parquet':
+                self._writer = self._pa_parquet.ParquetWriter(
+                    str(self.path),
+                    self._schema,
+                )
+            else:
+                self._writer = self._pa.ipc.new_file(
+                    str(self.path),
+                    self._schema,
+                )
+        self._writer.write_table(table)
+
+    def close(self):
+        """Finish the file"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def write_columnar(path, df):
+    """Write a dataframe to a Parquet, Feather, or Arrow file
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The file to write
+    df : pd.DataFrame
+        The data to write (the index is not written)
+
+    """
+    with ColumnarWriter(path) as writer:
+        writer.write(df)
+
+
+def _iter_batches(batches, batch_size):
+    """Yield dataframes of at most batch_size rows from Arrow batches"""
+    for batch in batches:
+        # Arrow batches can be larger than requested; slice them down
+        for start in range(0, batch.num_rows, batch_size):
+            yield batch.slice(start, batch_size).to_pandas()
+
+
+def _iter_ipc_batches(pa, reader, columns):
+    """Yield the record batches of an open Arrow IPC file"""
+    for batch_number in range(reader.num_record_batches):
+        batch = reader.get_batch(batch_number)
+        if columns is None:
+            yield batch
+        else:
+            table = pa.Table.from_batches([batch]).select(columns)
+            yield from table.to_batches()
+
+
+def _import_pyarrow():
+    """Import pyarrow or explain how to get it"""
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise SurgeoException(
+            'Parquet, Feather, and Arrow files need the pyarrow package. '
+            'Please install it (e.g. "pip install pyarrow").'
+        )
+    return pyarrow, pyarrow.feather, pyarrow.parquet
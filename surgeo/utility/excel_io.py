@@ -0,0 +1,246 @@
+"""Module streaming Excel workbooks row by row with openpyxl."""
+
+import datetime
+import pathlib
+
+import openpyxl
+import pandas as pd
+
+
+# The most rows (including the header row) an Excel sheet can hold
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def iter_excel(path, batch_size, columns=None):
+    """Read the first sheet of a workbook in batches of rows
+
+    The workbook is opened in openpyxl's read-only mode, so rows are parsed
+    as they are read and no cell objects are kept. Values are returned as
+    text like pd.read_excel(..., dtype=str) would return them.
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The .xlsx file to read
+    batch_size : int
+        The most rows in each dataframe
+    columns : Union[list, callable]
+        The header names to read, or a function that takes a header name
+        and returns True to read it (default: every column)
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        Consecutive slices of the sheet, each with a zero-based index
+
+    Raises
+    ------
+    ValueError
+        Raised if a listed column is not in the header
+
+    """
+    workbook = openpyxl.load_workbook(
+        path,
+        read_only=True,
+        data_only=True,
+        keep_links=False,
+    )
+    # Check the header now so missing columns are reported before iterating
+    try:
+        sheet = workbook.worksheets[0]
+        # Saved dimensions can be wrong; let openpyxl find the real ones
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+        header = [_to_text(value) for value in next(rows, ())]
+        positions = _select_positions(header, columns)
+    except Exception:
+        workbook.close()
+        raise
+    names = [header[position] for position in positions]
+    return _iter_batches(workbook, rows, positions, names, batch_size)
+
+
+def read_excel(path, columns=None) -> pd.DataFrame:
+    """Read the first sheet of a workbook with openpyxl's read-only mode
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The .xlsx file to read
+    columns : Union[list, callable]
+        The header names to read, or a function that takes a header name
+        and returns True to read it (default: every column)
+
+    Returns
+    -------
+    pd.DataFrame
+        The sheet's data as text
+
+    """
+    dfs = list(iter_excel(path, 65_536, columns))
+    return pd.concat(dfs, ignore_index=True)
+
+
+class ExcelWriter(object):
+    """Streams dataframes into a workbook with openpyxl's write-only mode
+
+    Rows are written as they arrive rather than held as cell objects. When
+    a sheet reaches Excel's row limit, the rest of the rows go to a new
+    sheet (Sheet1, Sheet2, ...) that repeats the header.
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The .xlsx file to write
+    max_rows : int
+        The most rows per sheet, including the header (default: Excel's
+        limit of 1,048,576)
+
+    Example
+    -------
+        .. code-block:: python
+
+            with ExcelWriter('output.xlsx') as writer:
+                for df in dfs:
+                    writer.write(df)
+
+    """
+
+    def __init__(self, path, max_rows=EXCEL_MAX_ROWS):
+        if max_rows < 2:
+            raise ValueError('max_rows must leave room for a header and data.')
+        self.path = pathlib.Path(path)
+        self.max_rows = max_rows
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._header = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, df):
+        """Append a dataframe's rows, starting new sheets as needed
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The rows to append (the index is not written)
+
+        """
+        if self._header is None:
+            self._header = [str(column) for column in df.columns]
+            self._add_sheet()
+        # Missing values become empty cells
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self._sheet_rows >= self.max_rows:
+                self._add_sheet()
+            self._sheet.append(row)
+            self._sheet_rows += 1
+
+    def close(self):
+        """Save the workbook"""
+        if self._workbook is None:
+            return
+        # A workbook needs at least one sheet
+        if self._sheet is None:
+            self._workbook.create_sheet('Sheet1')
+        self._workbook.save(self.path)
+        self._workbook = None
+
+    def _add_sheet(self):
+        """Start the next sheet with the header row"""
+        sheet_number = len(self._workbook.worksheets) + 1
+        self._sheet = self._workbook.create_sheet(f'Sheet{sheet_number}')
+        self._sheet.append(self._header)
+        self._sheet_rows = 1
+
+
+def write_excel(path, df, max_rows=EXCEL_MAX_ROWS):
+    """Write a dataframe to a workbook, splitting it across sheets if needed
+
+    Parameters
+    ----------
+    path : Union[str, pathlib.Path]
+        The .xlsx file to write
+    df : pd.DataFrame
+        The data to write (the index is not written)
+    max_rows : int
+        The most rows per sheet, including the header
+
+    """
+    with ExcelWriter(path, max_rows) as writer:
+        writer.write(df)
+
+
+def _select_positions(header, columns):
+    """Find the positions of the requested header names"""
+    if columns is None:
+        return list(range(len(header)))
+    if callable(columns):
+        return [
+            position
+            for position, name in enumerate(header)
+            if columns(name)
+        ]
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError(
+            'Usecols do not match columns, columns expected but not '
+            f'found: {missing}'
+        )
+    return [
+        position
+        for position, name in enumerate(header)
+        if name in columns
+    ]
+
+
+def _iter_batches(workbook, rows, positions, names, batch_size):
+    """Yield dataframes of the requested cells, closing the workbook after"""
+    try:
+        batch = []
+        yielded = False
+        # Blank rows are kept, but not the blank rows at the end of a sheet
+        pending_blanks = []
+        for row in rows:
+            values = [
+                _to_text(row[position]) if position < len(row) else None
+                for position in positions
+            ]
+            if all(value is None for value in row):
+                pending_blanks.append(values)
+                continue
+            batch.extend(pending_blanks)
+            pending_blanks.clear()
+            batch.append(values)
+            while len(batch) >= batch_size:
+                yield _make_df(batch[:batch_size], names)
+                batch = batch[batch_size:]
+                yielded = True
+        # A sheet without data rows still gives its header
+        if batch or not yielded:
+            yield _make_df(batch, names)
+    finally:
+        workbook.close()
+
+
+def _to_text(value):
+    """Convert a cell value to text as pd.read_excel(dtype=str) would"""
+    if value is None:
+        return None
+    # Whole numbers are stored as floats but displayed without decimals
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime.datetime):
+        return str(pd.Timestamp(value))
+    return str(value)
+
+
+def _make_df(rows, names):
+    """Build a text dataframe from rows of values"""
+    return pd.DataFrame(rows, columns=names, dtype=str)
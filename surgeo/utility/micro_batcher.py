@@ -0,0 +1,191 @@
+"""Module containing a micro-batching scheduler for the models."""
+
+import concurrent.futures
+import queue
+import threading
+import time
+
+import pandas as pd
+
+
+class MicroBatcher(object):
+    """Combines concurrent scoring requests into vectorized calls
+
+    Scoring a few records at a time wastes most of the vectorized
+    get_probabilities() path on fixed overhead. A MicroBatcher sits in
+    front of a scoring function (e.g. SurgeoModel().get_probabilities) and
+    lets many threads submit small requests. A background thread collects
+    requests until it has max_batch_size records or the oldest request has
+    waited max_latency_ms, concatenates them into one call, and hands each
+    caller its own slice of the result.
+
+    Larger batches raise throughput; a lower latency cap bounds the extra
+    time (and so the p99 latency) a request can spend waiting for others.
+    The batch_count and record_count attributes give the average batch size
+    achieved under load.
+
+    Parameters
+    ----------
+    score_function : callable
+        Takes one or more aligned pd.Series/pd.DataFrame arguments and
+        returns a dataframe with one row per input row
+    max_batch_size : int
+        The number of records at which a batch is run without waiting
+    max_latency_ms : float
+        The longest a request waits for others to join its batch
+
+    Example
+    -------
+        .. code-block:: python
+
+            model = surgeo.SurgeoModel()
+            with MicroBatcher(model.get_probabilities, 4096, 2.0) as batcher:
+                # Called from many threads at once
+                result = batcher.score(names, zctas)
+
+    """
+
+    def __init__(self, score_function, max_batch_size=1024, max_latency_ms=2.0):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be a positive integer.')
+        if max_latency_ms < 0:
+            raise ValueError('max_latency_ms cannot be negative.')
+        self.score_function = score_function
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self.batch_count = 0
+        self.record_count = 0
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def score(self, *inputs) -> pd.DataFrame:
+        """Score inputs as part of the next batch and wait for the result
+
+        Parameters
+        ----------
+        inputs : Union[pd.Series, pd.DataFrame]
+            The arguments for the scoring function
+
+        Returns
+        -------
+        pd.DataFrame
+            The rows of the batch result belonging to these inputs
+
+        """
+        return self.submit(*inputs).result()
+
+    def submit(self, *inputs) -> concurrent.futures.Future:
+        """Queue inputs for the next batch without waiting
+
+        Parameters
+        ----------
+        inputs : Union[pd.Series, pd.DataFrame]
+            The arguments for the scoring function
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A future resolving to the rows belonging to these inputs
+
+        Raises
+        ------
+        ValueError
+            Raised if the inputs are not all the same length, since their
+            rows would otherwise pair up with other requests' rows
+
+        """
+        if len({len(values) for values in inputs}) > 1:
+            raise ValueError(
+                'Inputs must all have the same length. Lengths: '
+                f'{[len(values) for values in inputs]}.'
+            )
+        if not self._thread.is_alive():
+            raise RuntimeError('The MicroBatcher has been closed.')
+        future = concurrent.futures.Future()
+        self._requests.put((inputs, future))
+        return future
+
+    def close(self):
+        """Score anything still queued and stop the background thread"""
+        if self._thread.is_alive():
+            self._requests.put(None)
+            self._thread.join()
+
+    def _run(self):
+        """Collect requests into batches until closed"""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            batch = [request]
+            batch_size = len(request[0][0])
+            deadline = time.monotonic() + self.max_latency_ms / 1000
+            closing = False
+            # Wait for company until the batch is full or the time is up
+            while batch_size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        request = self._requests.get(timeout=timeout)
+                    else:
+                        request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+                batch_size += len(request[0][0])
+            self._score_batch(batch)
+            if closing:
+                return
+
+    def _score_batch(self, batch):
+        """Score a batch in one call and give each request its rows"""
+        batch = [
+            (inputs, future)
+            for inputs, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+        self.batch_count += 1
+        self.record_count += sum(len(inputs[0]) for inputs, _ in batch)
+        try:
+            # Stack each argument position across the requests
+            combined = [
+                self._stack(arguments)
+                for arguments in zip(*(inputs for inputs, _ in batch))
+            ]
+            result = self.score_function(*combined)
+        except Exception:
+            # Score requests alone so one bad request fails by itself
+            for inputs, future in batch:
+                try:
+                    future.set_result(self.score_function(*inputs))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        start = 0
+        for inputs, future in batch:
+            stop = start + len(inputs[0])
+            future.set_result(result.iloc[start:stop].reset_index(drop=True))
+            start = stop
+
+    def _stack(self, arguments):
+        """Concatenate one argument of each request into a single input"""
+        first = arguments[0]
+        # Line up dataframe columns by position (as the models read them)
+        if isinstance(first, pd.DataFrame):
+            arguments = [
+                argument.set_axis(first.columns, axis=1)
+                for argument in arguments
+            ]
+        return pd.concat(arguments, ignore_index=True)
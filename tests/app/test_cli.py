@@ -1,15 +1,22 @@
+import concurrent.futures
+import importlib.util
+import io
+import multiprocessing
 import os
 import pathlib
 import subprocess
 import sys
 import tempfile
 import unittest
+import unittest.mock
 
 import numpy as np
 import pandas as pd
 
 import surgeo.app.surgeo_cli
 
+from surgeo.utility.columnar_io import read_columnar
+
 
 class TestSurgeoCLI(unittest.TestCase):
 
@@ -131,6 +138,193 @@ class TestSurgeoCLI(unittest.TestCase):
             'geocode_output.csv',
         )
 
+    def test_chunksize(self):
+        """Test streaming the CLI input through the model in chunks"""
+        self._compare(
+            'first_name_input.csv',
+            'first',
+            'first_name_output.csv',
+            chunksize='2',
+        )
+        self._compare(
+            'geocode_input.csv',
+            'geo',
+            'geocode_output.csv',
+            chunksize='2',
+        )
+
+    def test_workers(self):
+        """Test scoring the CLI input in a process pool"""
+        self._compare(
+            'first_name_input.csv',
+            'first',
+            'first_name_output.csv',
+            workers='2',
+        )
+        self._compare(
+            'geocode_input.csv',
+            'geo',
+            'geocode_output.csv',
+            workers='2',
+            chunksize='2',
+        )
+
+    def test_workers_spawn(self):
+        """Test pool workers that are spawned rather than forked"""
+        executor_class = concurrent.futures.ProcessPoolExecutor
+        executor_kwargs = []
+
+        def spawn_executor(**kwargs):
+            executor_kwargs.append(kwargs)
+            kwargs['mp_context'] = multiprocessing.get_context('spawn')
+            return executor_class(**kwargs)
+
+        argv = [
+            str(self._DATA_FOLDER / 'geocode_input.csv'),
+            self._CSV_OUTPUT_PATH,
+            'geo',
+            '--workers', '2',
+            '--chunksize', '2',
+            '--no_daemon',
+        ]
+        with unittest.mock.patch.object(
+                concurrent.futures,
+                'ProcessPoolExecutor',
+                side_effect=spawn_executor):
+            surgeo.app.surgeo_cli.SurgeoCLI(argv).main()
+        # Spawned workers are sent the arguments, not the CLI and its models
+        self.assertEqual(executor_kwargs[0]['initargs'], (argv,))
+        df_generated = pd.read_csv(self._CSV_OUTPUT_PATH)
+        df_true = pd.read_csv(self._DATA_FOLDER / 'geocode_output.csv')
+        self._is_close_enough(df_generated, df_true)
+
+    def test_stream(self):
+        """Test reading stdin and writing stdout as CSV and NDJSON"""
+        # CSV in, CSV out
+        input_text = (self._DATA_FOLDER / 'first_name_input.csv').read_text()
+        completed = subprocess.run(
+            [sys.executable, self._CLI_SCRIPT, '-', '-', 'first',
+             '--chunksize', '2'],
+            input=input_text,
+            capture_output=True,
+            text=True,
+        )
+        df_generated = pd.read_csv(io.StringIO(completed.stdout))
+        df_true = pd.read_csv(self._DATA_FOLDER / 'first_name_output.csv')
+        self._is_close_enough(df_generated, df_true)
+        # NDJSON in, NDJSON out
+        df_input = pd.read_csv(
+            self._DATA_FOLDER / 'geocode_input.csv',
+            skip_blank_lines=False,
+        )
+        input_text = df_input.to_json(orient='records', lines=True)
+        completed = subprocess.run(
+            [sys.executable, self._CLI_SCRIPT, '-', '-', 'geo',
+             '--format', 'ndjson'],
+            input=input_text,
+            capture_output=True,
+            text=True,
+        )
+        df_generated = pd.read_json(
+            io.StringIO(completed.stdout),
+            orient='records',
+            lines=True,
+        )
+        df_true = pd.read_csv(self._DATA_FOLDER / 'geocode_output.csv')
+        self._is_close_enough(df_generated, df_true)
+        # A header without records still gives the output header
+        completed = subprocess.run(
+            [sys.executable, self._CLI_SCRIPT, '-', '-', 'sur'],
+            input='name,zcta5\n',
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(
+            completed.stdout.splitlines(),
+            ['name,white,black,api,native,multiple,hispanic'],
+        )
+        # A line that is not JSON is reported by number
+        completed = subprocess.run(
+            [sys.executable, self._CLI_SCRIPT, '-', '-', 'sur',
+             '--format', 'ndjson'],
+            input='{"name": "Diaz"}\nname,zcta5\n',
+            capture_output=True,
+            text=True,
+        )
+        self.assertNotEqual(completed.returncode, 0)
+        self.assertIn(
+            'SurgeoException: Cannot read stdin line 2',
+            completed.stderr,
+        )
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'needs pyarrow')
+    def test_columnar(self):
+        """Test Parquet and Arrow input and output, whole and in chunks"""
+        df_input = pd.read_csv(
+            self._DATA_FOLDER / 'geocode_input.csv',
+            skip_blank_lines=False,
+        )
+        df_true = pd.read_csv(self._DATA_FOLDER / 'geocode_output.csv')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = pathlib.Path(temp_dir, 'input.parquet')
+            # An extra column that the model does not need is never read
+            df_input.assign(extra='x').to_parquet(input_path)
+            for suffix, chunk_args in [('.arrow', []),
+                                       ('.parquet', ['--chunksize', '2'])]:
+                output_path = pathlib.Path(temp_dir, 'output' + suffix)
+                subprocess.run([
+                    sys.executable,
+                    self._CLI_SCRIPT,
+                    str(input_path),
+                    str(output_path),
+                    'geo',
+                    *chunk_args,
+                ])
+                df_generated = read_columnar(output_path)
+                self._is_close_enough(df_generated, df_true)
+            # A corrupt file is reported the same way whole and in chunks
+            input_path.write_bytes(b'not a parquet file')
+            for chunk_args in [[], ['--chunksize', '10']]:
+                completed = subprocess.run(
+                    [sys.executable, self._CLI_SCRIPT, str(input_path),
+                     self._CSV_OUTPUT_PATH, 'geo', *chunk_args],
+                    capture_output=True,
+                    text=True,
+                )
+                self.assertIn(
+                    f'SurgeoException: Cannot read "{input_path}"',
+                    completed.stderr,
+                )
+
+    def test_keep_columns(self):
+        """Test only model columns are read and kept columns pass through"""
+        df_input = pd.read_csv(
+            self._DATA_FOLDER / 'geocode_input.csv',
+            skip_blank_lines=False,
+        )
+        df_true = pd.read_csv(self._DATA_FOLDER / 'geocode_output.csv')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = pathlib.Path(temp_dir, 'input.csv')
+            df_input.assign(
+                id=[f'0{i}' for i in range(len(df_input))],
+                unused=1.5,
+            ).to_csv(input_path, index=False)
+            subprocess.run([
+                sys.executable,
+                self._CLI_SCRIPT,
+                str(input_path),
+                self._CSV_OUTPUT_PATH,
+                'geo',
+                '--keep_columns',
+                'id',
+            ])
+        df_generated = pd.read_csv(self._CSV_OUTPUT_PATH, dtype={'id': str})
+        self.assertEqual(df_generated.columns[0], 'id')
+        self.assertNotIn('unused', df_generated.columns)
+        # Kept columns are copied as text
+        self.assertEqual(df_generated['id'][0], '00')
+        self._is_close_enough(df_generated, df_true)
+
     def test_excel(self):
         """Test Excel functionality of CLI"""
         # Generate input name based on input file
@@ -149,6 +343,87 @@ class TestSurgeoCLI(unittest.TestCase):
         df_true = pd.read_excel(self._DATA_FOLDER / 'surgeo_output.xlsx', engine='openpyxl')
         self._is_close_enough(df_generated, df_true)
 
+    def test_excel_chunks(self):
+        """Test Excel input and output read and written in chunks"""
+        df_input = pd.read_csv(
+            self._DATA_FOLDER / 'geocode_input.csv',
+            skip_blank_lines=False,
+        )
+        df_true = pd.read_csv(self._DATA_FOLDER / 'geocode_output.csv')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = pathlib.Path(temp_dir, 'input.xlsx')
+            output_path = pathlib.Path(temp_dir, 'output.xlsx')
+            df_input.assign(extra='x').to_excel(input_path, index=False)
+            subprocess.run([
+                sys.executable,
+                self._CLI_SCRIPT,
+                str(input_path),
+                str(output_path),
+                'geo',
+                '--chunksize',
+                '2',
+            ])
+            df_generated = pd.read_excel(output_path, engine='openpyxl')
+            self._is_close_enough(df_generated, df_true)
+
+    def test_compressed(self):
+        """Test compressed CSV input and rounded, compressed output"""
+        df_input = pd.read_csv(
+            self._DATA_FOLDER / 'geocode_input.csv',
+            skip_blank_lines=False,
+        )
+        df_true = pd.read_csv(self._DATA_FOLDER / 'geocode_output.csv')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = pathlib.Path(temp_dir, 'input.csv.bz2')
+            df_input.to_csv(input_path, index=False)
+            for suffix, chunk_args in [('.csv.xz', []),
+                                       ('.csv.gz', ['--chunksize', '2'])]:
+                output_path = pathlib.Path(temp_dir, 'output' + suffix)
+                subprocess.run([
+                    sys.executable,
+                    self._CLI_SCRIPT,
+                    str(input_path),
+                    str(output_path),
+                    'geo',
+                    '--precision',
+                    '4',
+                    *chunk_args,
+                ])
+                df_generated = pd.read_csv(output_path)
+                self._is_close_enough(df_generated, df_true)
+                # Every probability was written with at most four decimals
+                probabilities = df_generated.select_dtypes(np.float64)
+                self.assertTrue(probabilities.equals(probabilities.round(4)))
+
+    def test_compact(self):
+        """Test --margin writes only the most likely race and its lead"""
+        input_path = str(self._DATA_FOLDER / 'surgeo_input.csv')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = pathlib.Path(temp_dir, 'output.csv')
+            true_output_path = pathlib.Path(temp_dir, 'true.csv')
+            for path, args in [(output_path, ['--margin']),
+                               (true_output_path, [])]:
+                subprocess.run([
+                    sys.executable,
+                    self._CLI_SCRIPT,
+                    input_path,
+                    str(path),
+                    'surgeo',
+                    *args,
+                ])
+            df_generated = pd.read_csv(output_path)
+            df_true = pd.read_csv(true_output_path)
+        self.assertEqual(
+            list(df_generated.columns),
+            ['zcta5', 'name', 'race', 'probability', 'margin'],
+        )
+        probs = df_true.iloc[:, 2:]
+        found = probs.notna().any(axis=1)
+        self.assertEqual(
+            list(df_generated.loc[found, 'race']),
+            list(probs[found].idxmax(axis=1)),
+        )
+
     def test_malformed(self):
         """Test arguments to specify column names"""
         # Generate input name based on input file
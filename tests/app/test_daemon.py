@@ -0,0 +1,155 @@
+import os
+import pathlib
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+
+import surgeo.app.surgeo_daemon
+
+from surgeo.app.daemon_client import get_socket_path
+from surgeo.app.daemon_client import run_in_daemon
+from surgeo.app.surgeo_cli import SurgeoCLI
+from surgeo.utility.surgeo_exception import SurgeoException
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'needs Unix sockets')
+class TestSurgeoDaemon(unittest.TestCase):
+
+    _DATA_FOLDER = pathlib.Path(__file__).resolve().parents[1] / 'data'
+
+    def setUp(self):
+        """Run a daemon on a temporary socket in a background thread"""
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._socket_path = pathlib.Path(self._temp_dir.name, 'surgeo.sock')
+        self._daemon = surgeo.app.surgeo_daemon.SurgeoDaemon(
+            ['--socket', str(self._socket_path)]
+        )
+        self._server = self._daemon._make_server()
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.start()
+        self._patch = unittest.mock.patch.dict(
+            'os.environ',
+            {'SURGEO_SOCKET': str(self._socket_path)},
+        )
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._temp_dir.cleanup()
+
+    def test_run(self):
+        """Test a job run by the daemon matches one run in-process"""
+        input_path = str(self._DATA_FOLDER / 'surgeo_input.csv')
+        output_path = pathlib.Path(self._temp_dir.name, 'output.csv')
+        true_output_path = pathlib.Path(self._temp_dir.name, 'true.csv')
+        ran = run_in_daemon(
+            [input_path, 'output.csv', 'surgeo'],
+            cwd=self._temp_dir.name,
+        )
+        self.assertTrue(ran)
+        SurgeoCLI(
+            [input_path, str(true_output_path), 'surgeo', '--no_daemon']
+        ).main()
+        self.assertEqual(
+            output_path.read_bytes(),
+            true_output_path.read_bytes(),
+        )
+
+    def test_errors(self):
+        """Test job errors are raised and bad arguments fall back"""
+        input_path = str(self._DATA_FOLDER / 'surgeo_input.csv')
+        with self.assertRaises(SurgeoException):
+            run_in_daemon([input_path, 'output.csv', 'nope'])
+        # Errors raised while the daemon sets up the job are replied too
+        with self.assertRaises(SurgeoException):
+            run_in_daemon([input_path, 'output.csv', 'geo', '--compact'])
+        self.assertFalse(run_in_daemon([input_path]))
+        self._patch.stop()
+        self._patch = unittest.mock.patch.dict(
+            'os.environ',
+            {'SURGEO_SOCKET': str(self._socket_path) + '.missing'},
+        )
+        self._patch.start()
+        self.assertFalse(run_in_daemon([input_path, 'output.csv', 'surgeo']))
+
+    def test_serial(self):
+        """Test concurrent calls run one job at a time"""
+        input_path = str(self._DATA_FOLDER / 'surgeo_input.csv')
+        running = []
+        overlaps = []
+
+        def fake_main(cli):
+            running.append(cli)
+            overlaps.append(len(running) > 1)
+            time.sleep(0.2)
+            running.remove(cli)
+
+        with unittest.mock.patch.object(SurgeoCLI, 'main', fake_main):
+            threads = [
+                threading.Thread(
+                    target=run_in_daemon,
+                    args=([input_path, f'output{i}.csv', 'surgeo'],),
+                )
+                for i in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(overlaps, [False] * 3)
+
+    def test_socket_owner(self):
+        """Test jobs only go to a socket owned by this user"""
+        input_path = str(self._DATA_FOLDER / 'surgeo_input.csv')
+        argv = [input_path, 'output.csv', 'surgeo']
+        with unittest.mock.patch('os.getuid', return_value=os.getuid() + 1):
+            self.assertFalse(run_in_daemon(argv, cwd=self._temp_dir.name))
+        self.assertFalse(
+            pathlib.Path(self._temp_dir.name, 'output.csv').exists()
+        )
+        # A file that is not a socket is never used or replaced
+        fake_path = pathlib.Path(self._temp_dir.name, 'fake.sock')
+        fake_path.touch()
+        with unittest.mock.patch.dict(
+                'os.environ',
+                {'SURGEO_SOCKET': str(fake_path)}):
+            self.assertFalse(run_in_daemon(argv))
+            daemon = surgeo.app.surgeo_daemon.SurgeoDaemon([])
+            with self.assertRaises(SurgeoException):
+                daemon._make_server()
+
+    def test_socket_path(self):
+        """Test the default socket is in a directory only this user can use"""
+        with unittest.mock.patch.dict('os.environ', clear=True):
+            with unittest.mock.patch(
+                    'tempfile.gettempdir',
+                    return_value=self._temp_dir.name):
+                socket_path = get_socket_path()
+                self.assertEqual(
+                    socket_path.parent,
+                    pathlib.Path(self._temp_dir.name, f'surgeo-{os.getuid()}'),
+                )
+                # A directory others can reach is refused
+                socket_path.parent.mkdir(mode=0o755)
+                socket_path.parent.chmod(0o755)
+                daemon = surgeo.app.surgeo_daemon.SurgeoDaemon([])
+                with self.assertRaises(SurgeoException):
+                    daemon._make_server()
+                socket_path.parent.chmod(0o700)
+                server = daemon._make_server()
+                server.server_close()
+            os.environ['XDG_RUNTIME_DIR'] = self._temp_dir.name
+            self.assertEqual(
+                get_socket_path(),
+                pathlib.Path(self._temp_dir.name, 'surgeo.sock'),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
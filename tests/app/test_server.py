@@ -0,0 +1,98 @@
+import json
+import threading
+import unittest
+import unittest.mock
+import urllib.error
+import urllib.request
+
+import pandas as pd
+
+import surgeo.app.surgeo_server
+
+from surgeo.models.surgeo_model import SurgeoModel
+
+
+class TestSurgeoServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Run a server on a free port in a background thread"""
+        cls._SERVER = surgeo.app.surgeo_server.SurgeoServer(['--port', '0'])
+        cls._HTTPD = cls._SERVER._make_server()
+        host, port = cls._HTTPD.server_address[:2]
+        cls._URL = f'http://{host}:{port}'
+        cls._THREAD = threading.Thread(target=cls._HTTPD.serve_forever)
+        cls._THREAD.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._HTTPD.shutdown()
+        cls._HTTPD.server_close()
+        cls._THREAD.join()
+
+    def _request(self, path, payload=None):
+        """Helper function that returns the status and JSON of a request"""
+        data = None if payload is None else json.dumps(payload).encode()
+        request = urllib.request.Request(self._URL + path, data=data)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def test_health(self):
+        """Test the health check lists the models"""
+        status, payload = self._request('/health')
+        self.assertEqual(status, 200)
+        self.assertIn('surgeo', payload['models'])
+
+    def test_batch_and_one(self):
+        """Test batch and single record results match the model"""
+        records = [
+            {'name': 'Davis', 'zcta5': '63110'},
+            {'name': None, 'zcta5': 631},
+            {'name': 'Jones'},
+        ]
+        status, payload = self._request('/surgeo', {'records': records})
+        self.assertEqual(status, 200)
+        true_result = SurgeoModel().get_probabilities(
+            pd.Series([record.get('name') for record in records]),
+            pd.Series([record.get('zcta5') for record in records]),
+        )
+        result = pd.DataFrame(payload['results'])
+        pd.testing.assert_frame_equal(
+            result.astype(object).where(result.notna(), None),
+            true_result.astype(object).where(true_result.notna(), None),
+        )
+        status, result = self._request('/surgeo/one', records[0])
+        self.assertEqual(status, 200)
+        self.assertEqual(result, payload['results'][0])
+
+    def test_errors(self):
+        """Test bad requests get error responses"""
+        status, payload = self._request('/nope', {'records': []})
+        self.assertEqual(status, 400)
+        self.assertIn('error', payload)
+        status, payload = self._request('/geo', {'records': 'bad'})
+        self.assertEqual(status, 400)
+        status, payload = self._request('/geo/two', {})
+        self.assertEqual(status, 404)
+        # Fields must be single values in batches and single records
+        record = {'name': ['x'], 'zcta5': '63110'}
+        status, payload = self._request('/surgeo', {'records': [record]})
+        self.assertEqual(status, 400)
+        status, payload = self._request('/surgeo/one', record)
+        self.assertEqual(status, 400)
+        # Unexpected errors still get a response
+        with unittest.mock.patch.object(
+                self._SERVER._models['geo'],
+                'score_one',
+                side_effect=RuntimeError('boom')):
+            with unittest.mock.patch('traceback.print_exc'):
+                status, payload = self._request('/geo/one', {'zcta5': '63110'})
+        self.assertEqual(status, 500)
+        self.assertIn('boom', payload['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
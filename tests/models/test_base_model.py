@@ -1,7 +1,17 @@
+import json
+import multiprocessing
+import os
+import pathlib
+import tempfile
 import unittest
+import unittest.mock
+import warnings
 
+import numpy as np
 import pandas as pd
 
+import surgeo.models.base_model
+
 from surgeo.models.base_model import BaseModel
 
 
@@ -13,6 +23,11 @@ class TestBaseModel(unittest.TestCase):
         'P3T3RS0N '   : 'PTRSN',
         ' D\'angelo'  : 'DANGELO',
         'DE SANTIS '  : 'DESANTIS',
+        'Smith\xa0Sr' : 'SMITH',
+        'Jones III\xa0': 'JONES',
+        'Sr.'         : '',
+        'Ivy'         : 'IVY',
+        'nan'         : 'NAN',
     }
 
     _NORMALIZED_ZCTA_MAPPING = {
@@ -49,6 +64,183 @@ class TestBaseModel(unittest.TestCase):
         self.assertIsInstance(df, pd.DataFrame)
         self.assertEqual(len(df), self._SURNAME_DF_LENGTH)
 
+    def test_compiled_tables(self):
+        """Check compiled tables match their CSVs and are rebuilt if stale"""
+        model = BaseModel()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            model._cache_root = pathlib.Path(temp_dir)
+            load = lambda: model._load_table(
+                'prob_race_given_zcta_2010.csv',
+                ['zcta5'],
+                5,
+            )
+            csv_df = load()
+            meta_path = (
+                model._cache_root / 'prob_race_given_zcta_2010' / 'meta.json'
+            )
+            self.assertTrue(meta_path.exists())
+            compiled_meta = json.loads(meta_path.read_text())
+            # Second load maps the compiled arrays read-only
+            np_load = np.load
+            loaded_arrays = []
+
+            def record_load(*args, **kwargs):
+                array = np_load(*args, **kwargs)
+                loaded_arrays.append(array)
+                return array
+
+            with unittest.mock.patch.object(np, 'load', record_load):
+                compiled_df = load()
+            pd.testing.assert_frame_equal(csv_df, compiled_df)
+            self.assertEqual(len(loaded_arrays), 2)
+            for array in loaded_arrays:
+                self.assertIsInstance(array, np.memmap)
+                self.assertEqual(array.mode, 'r')
+                self.assertFalse(array.flags.writeable)
+            self.assertTrue(
+                np.shares_memory(compiled_df.to_numpy(), loaded_arrays[0])
+            )
+            # A touched but unchanged CSV still uses the compiled arrays
+            meta = dict(compiled_meta, mtime_ns=0)
+            meta_path.write_text(json.dumps(meta))
+            pd.testing.assert_frame_equal(csv_df, load())
+            self.assertEqual(json.loads(meta_path.read_text()), meta)
+            # A CSV whose size and hash no longer match is read and recompiled
+            meta = dict(compiled_meta, size=0, sha256='stale')
+            meta_path.write_text(json.dumps(meta))
+            loaded_arrays.clear()
+            with unittest.mock.patch.object(np, 'load', record_load):
+                pd.testing.assert_frame_equal(csv_df, load())
+            self.assertEqual(loaded_arrays, [])
+            self.assertEqual(json.loads(meta_path.read_text()), compiled_meta)
+
+    def test_cache_root(self):
+        """Check a read-only package keeps compiled tables in a user cache"""
+        base_model = surgeo.models.base_model
+        with tempfile.TemporaryDirectory() as temp_dir:
+            environ = {'SURGEO_CACHE_DIR': '', 'XDG_CACHE_HOME': temp_dir}
+            with unittest.mock.patch.dict(os.environ, environ):
+                with unittest.mock.patch.object(
+                        base_model.os,
+                        'access',
+                        return_value=False):
+                    model = BaseModel()
+                self.assertEqual(
+                    model._cache_root,
+                    pathlib.Path(temp_dir, 'surgeo'),
+                )
+                environ = {'SURGEO_CACHE_DIR': temp_dir}
+                with unittest.mock.patch.dict(os.environ, environ):
+                    self.assertEqual(
+                        BaseModel()._cache_root,
+                        pathlib.Path(temp_dir),
+                    )
+
+    def test_compile_warning(self):
+        """Check a table that cannot be compiled is reported once"""
+        base_model = surgeo.models.base_model
+        model = BaseModel()
+        load = lambda: model._load_table(
+            'prob_race_given_zcta_2010.csv',
+            ['zcta5'],
+            5,
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # A file where the cache directory should be cannot be written
+            model._cache_root = pathlib.Path(temp_dir, 'file')
+            model._cache_root.write_text('')
+            with unittest.mock.patch.object(
+                    base_model,
+                    '_COMPILE_WARNED',
+                    False):
+                with self.assertWarns(RuntimeWarning):
+                    load()
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error')
+                    load()
+
+    def test_registry(self):
+        """Check tables are loaded once and shared read-only"""
+        base_model = surgeo.models.base_model
+        base_model.evict()
+        self.assertEqual(base_model.loaded_tables(), [])
+        base_model.preload('race_given_first_name')
+        self.assertEqual(
+            base_model.loaded_tables(),
+            ['race_given_first_name'],
+        )
+        # Two models share the same values, which cannot be written to
+        first = BaseModel()._get_prob_race_given_first_name()
+        second = BaseModel()._get_prob_race_given_first_name()
+        self.assertTrue(
+            np.shares_memory(first.to_numpy(), second.to_numpy())
+        )
+        self.assertFalse(first.to_numpy().flags.writeable)
+        # Evicting leaves existing views intact
+        base_model.evict('race_given_first_name')
+        self.assertEqual(base_model.loaded_tables(), [])
+        self.assertEqual(len(first), len(second))
+
+    def test_shared_tables(self):
+        """Test sharing tables with other processes via shared memory"""
+        base_model = surgeo.models.base_model
+        original = BaseModel()._get_table('race_given_tract')
+        handle = base_model.share_tables('race_given_tract')
+        try:
+            # A fresh process sees the table once it attaches
+            context = multiprocessing.get_context('spawn')
+            with context.Pool(
+                1,
+                initializer=base_model.attach_tables,
+                initargs=(handle,),
+            ) as pool:
+                self.assertEqual(
+                    pool.apply(base_model.loaded_tables),
+                    ['race_given_tract'],
+                )
+            # And here, attaching swaps in read-only views of the block
+            base_model.attach_tables(handle)
+            attached = BaseModel()._get_table('race_given_tract')
+            self.assertTrue(attached.equals(original))
+            self.assertFalse(attached.to_numpy().flags.writeable)
+        finally:
+            base_model.evict()
+            base_model.release_tables(handle)
+
+    @unittest.skipUnless(
+        pathlib.Path('/proc/self/maps').exists(),
+        'needs /proc/self/maps',
+    )
+    def test_shared_tables_unmapped(self):
+        """Test attached blocks are unmapped once their tables are unused"""
+        base_model = surgeo.models.base_model
+
+        def is_mapped(handle):
+            block_name = handle['race_given_tract']['values'][0]
+            maps = pathlib.Path('/proc/self/maps').read_text()
+            return block_name.lstrip('/') in maps
+
+        first_handle = base_model.share_tables('race_given_tract')
+        second_handle = base_model.share_tables('race_given_tract')
+        try:
+            base_model.attach_tables(first_handle)
+            values = BaseModel()._get_table('race_given_tract').to_numpy()
+            # A table still in use stays mapped after it is evicted
+            base_model.evict()
+            self.assertTrue(is_mapped(first_handle))
+            del values
+            self.assertFalse(is_mapped(first_handle))
+            # Attaching another handle replaces the first one's mapping
+            base_model.attach_tables(first_handle)
+            base_model.attach_tables(second_handle)
+            self.assertFalse(is_mapped(first_handle))
+            self.assertTrue(is_mapped(second_handle))
+        finally:
+            base_model.evict()
+            base_model.release_tables(first_handle)
+            base_model.release_tables(second_handle)
+        self.assertFalse(is_mapped(second_handle))
+
     def test_normalize_names(self):
         """Test string normalization routines for names"""
         # Generate series
@@ -60,6 +252,59 @@ class TestBaseModel(unittest.TestCase):
         for correct_output, function_output in zip_object:
             self.assertEqual(correct_output, function_output)
 
+    def test_normalize_unicode_names(self):
+        """Test non-ASCII names follow Python's str and re semantics"""
+        mapping = {
+            # A non-breaking space counts as whitespace before a suffix
+            'garcia\xa0jr': 'GARCIA',
+            'garcia\xa0': 'GARCIA\xa0',
+            'iv\xa0': '',
+            # Upper casing uses Python's full case mappings
+            '\xdf': 'SS',
+            'stra\xdfe': 'STRASSE',
+            '\ufb01sher': 'FISHER',
+            'jos\xe9 sr': 'JOS\xc9',
+        }
+        original = pd.Series(list(mapping.keys()))
+        function_output = self._BASE_MODEL._normalize_names(original)
+        self.assertEqual(function_output.tolist(), list(mapping.values()))
+        # The scalar path agrees with the vectorized one
+        for name, correct_output in mapping.items():
+            self.assertEqual(
+                self._BASE_MODEL._normalize_scalar_name(name),
+                correct_output,
+            )
+
+    def test_factorize(self):
+        """Test factorized values (including missing ones) round trip"""
+        values = pd.Series(['631', None, 631, '631', np.nan, 'Davis'])
+        codes, uniques = self._BASE_MODEL._factorize(values)
+        self.assertEqual(len(uniques), 4)
+        round_trip = uniques.take(codes).reset_index(drop=True)
+        self.assertTrue(round_trip.isna().equals(values.isna()))
+        self.assertTrue(round_trip.dropna().equals(values.dropna()))
+
+    def test_posterior(self):
+        """Test the shared kernel against the pandas calculation"""
+        rng = np.random.default_rng(0)
+        first = rng.random((50, 6))
+        second = rng.random((50, 6))
+        first[3, 2] = np.nan
+        second[7, :] = np.nan
+        second[9, :] = 0
+        numer = pd.DataFrame(first) * pd.DataFrame(second)
+        expected = numer.div(numer.sum(axis=1), axis=0).to_numpy()
+        out = np.empty((50, 6))
+        result = self._BASE_MODEL._posterior(first, second, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+        self.assertTrue(np.isnan(result[[7, 9]]).all())
+        self.assertAlmostEqual(np.nansum(result[3]), 1.0)
+        # The first factor can be its own output buffer
+        result = self._BASE_MODEL._posterior(first, second, out=first)
+        self.assertIs(result, first)
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+
     def test_normalize_zctas(self):
         """Test string normalization routines for ZCTAs"""
         # Generate series
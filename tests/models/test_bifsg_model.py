@@ -1,6 +1,7 @@
 import pathlib
 import unittest
 
+import numpy as np
 import pandas as pd
 
 from surgeo.models.bifsg_model import BIFSGModel
@@ -43,5 +44,120 @@ class TestSurgeoModel(unittest.TestCase):
         pd.testing.assert_frame_equal(result, true_result)
 
 
+    def test_dedup(self):
+        """Test deduplicated scoring matches scoring every row"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'bifsg_input.csv',
+            skip_blank_lines=False,
+        )
+        data = pd.concat([data] * 2, ignore_index=True)
+        model = BIFSGModel(dedup=True)
+        result = model.get_probabilities(
+            data['first_name'],
+            data['surname'],
+            data['zcta5'],
+        )
+        true_result = self._BIFSG_MODEL.get_probabilities(
+            data['first_name'],
+            data['surname'],
+            data['zcta5'],
+        )
+        pd.testing.assert_frame_equal(result, true_result)
+        self.assertEqual(model.dedup_ratio, 2.0)
+
+    def test_dedup_normalized(self):
+        """Test rows that normalize alike are scored once"""
+        first_names = pd.Series(['Hector', 'HECTOR', 'hector', 'Maria'])
+        surnames = pd.Series(['Diaz', 'DIAZ JR', 'diaz', 'Diaz'])
+        zctas = pd.Series([79902, '79902', ' 79902', '79902'])
+        model = BIFSGModel(dedup=True)
+        result = model.get_probabilities(first_names, surnames, zctas)
+        true_result = self._BIFSG_MODEL.get_probabilities(
+            first_names,
+            surnames,
+            zctas,
+        )
+        pd.testing.assert_frame_equal(result, true_result)
+        self.assertEqual(model.dedup_ratio, 2.0)
+
+    def test_index(self):
+        """Test results keep the index of a non-RangeIndex input"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'bifsg_input.csv',
+            skip_blank_lines=False,
+        )
+        data = pd.concat([data] * 2, ignore_index=True)
+        true_result = self._BIFSG_MODEL.get_probabilities(
+            data['first_name'],
+            data['surname'],
+            data['zcta5'],
+        )
+        data.index = [f'row{number}' for number in range(len(data))][::-1]
+        true_result.index = data.index
+        for model in (self._BIFSG_MODEL, BIFSGModel(dedup=True)):
+            result = model.get_probabilities(
+                data['first_name'],
+                data['surname'],
+                data['zcta5'],
+            )
+            pd.testing.assert_frame_equal(result, true_result)
+
+    def test_compact(self):
+        """Test compact results hold the most likely race of full results"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'bifsg_input.csv',
+            skip_blank_lines=False,
+        )
+        model = BIFSGModel(compact=True)
+        result = model.get_probabilities(
+            data['first_name'],
+            data['surname'],
+            data['zcta5'],
+        )
+        true_result = self._BIFSG_MODEL.get_probabilities(
+            data['first_name'],
+            data['surname'],
+            data['zcta5'],
+        )
+        probs = true_result.iloc[:, 3:]
+        self.assertEqual(
+            list(result.columns),
+            ['zcta5', 'first_name', 'surname', 'race', 'probability'],
+        )
+        found = probs.notna().any(axis=1)
+        pd.testing.assert_series_equal(
+            result.loc[found, 'race'].astype(str),
+            probs[found].idxmax(axis=1).astype(str),
+            check_names=False,
+        )
+        np.testing.assert_allclose(
+            result.loc[found, 'probability'],
+            probs[found].max(axis=1),
+            atol=1e-6,
+        )
+
+    def test_score_one(self):
+        """Test single record scoring matches the batch results"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'bifsg_input.csv',
+            skip_blank_lines=False,
+        )
+        true_result = self._BIFSG_MODEL.get_probabilities(
+            data['first_name'],
+            data['surname'],
+            data['zcta5'],
+        )
+        for i, row in data.iterrows():
+            result = self._BIFSG_MODEL.score_one(
+                row['first_name'],
+                row['surname'],
+                row['zcta5'],
+            )
+            pd.testing.assert_series_equal(
+                pd.Series(result, name=i, dtype=object),
+                true_result.iloc[i].astype(object),
+            )
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -35,6 +35,16 @@ class TestGeocodeModel(unittest.TestCase):
             result.equals(true_result)
         )
 
+    def test_integer_zctas(self):
+        """Test integer ZCTAs give the same result as their strings"""
+        zctas = pd.Series([631, 63110, -631, 123456, 99999])
+        result = self._GEOCODE_MODEL.get_probabilities(zctas)
+        true_result = self._GEOCODE_MODEL.get_probabilities(
+            zctas.astype(str)
+        )
+        pd.testing.assert_frame_equal(result, true_result)
+        self.assertEqual(result['white'].notna().sum(), 2)
+
     def test_get_probabilities_tract(self):
         """Test Geocode model versus known result with Tracts"""
         # Get our data and clean it
@@ -56,5 +66,22 @@ class TestGeocodeModel(unittest.TestCase):
             result.equals(true_result)
         )
 
+    def test_integer_tracts(self):
+        """Test numeric tract codes give the same result as strings"""
+        input_data = pd.read_csv(
+            self._DATA_FOLDER / 'tract_input.csv',
+            dtype=str,
+        ).iloc[:-1, :3]
+        result = self._GEOCODE_MODEL_TRACT.get_probabilities_tract(
+            input_data.astype(int)
+        )
+        true_result = self._GEOCODE_MODEL_TRACT.get_probabilities_tract(
+            input_data
+        )
+        pd.testing.assert_frame_equal(
+            result.iloc[:, 3:],
+            true_result.iloc[:, 3:],
+        )
+
 if __name__ == '__main__':
     unittest.main()
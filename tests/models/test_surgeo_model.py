@@ -1,9 +1,12 @@
 import pathlib
 import unittest
+import unittest.mock
 
+import numpy as np
 import pandas as pd
 
 from surgeo.models.surgeo_model import SurgeoModel
+from surgeo.utility.surgeo_exception import SurgeoException
 
 
 class TestSurgeoModel(unittest.TestCase):
@@ -67,5 +70,198 @@ class TestSurgeoModel(unittest.TestCase):
             result.equals(true_result)
         )
 
+    def test_dedup(self):
+        """Test deduplicated scoring matches scoring every row"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        data = pd.concat([data] * 3, ignore_index=True)
+        model = SurgeoModel(dedup=True)
+        result = model.get_probabilities(data['name'], data['zcta5'])
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        pd.testing.assert_frame_equal(result, true_result)
+        self.assertEqual(model.dedup_ratio, 3.75)
+
+    def test_dedup_normalized(self):
+        """Test rows that normalize alike are scored once"""
+        names = pd.Series(['Smith', 'SMITH ', 'smith jr', 'Diaz', 'DIAZ'])
+        zctas = pd.Series([631, '00631', ' 631', '63110', '63110'])
+        model = SurgeoModel(dedup=True)
+        result = model.get_probabilities(names, zctas)
+        true_result = self._SURGEO_MODEL.get_probabilities(names, zctas)
+        pd.testing.assert_frame_equal(result, true_result)
+        self.assertEqual(model.dedup_ratio, 2.5)
+        # Tract parts written as numbers or as text share a GEOID
+        tracts = pd.DataFrame({
+            'state': ['29', 29, '29'],
+            'county': ['510', 510, '510'],
+            'tract': ['101200', 101200, '101200'],
+        })
+        model = SurgeoModel(geo_level='TRACT', dedup=True)
+        result = model.get_probabilities(names.iloc[:3], tracts)
+        true_result = SurgeoModel(geo_level='TRACT').get_probabilities(
+            names.iloc[:3],
+            tracts,
+        )
+        pd.testing.assert_frame_equal(result, true_result)
+        self.assertEqual(model.dedup_ratio, 3.0)
+
+    def test_index(self):
+        """Test results keep the index of a non-RangeIndex input"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        data = pd.concat([data] * 2, ignore_index=True)
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        data.index = [f'row{number}' for number in range(len(data))][::-1]
+        true_result.index = data.index
+        for model in (self._SURGEO_MODEL, SurgeoModel(dedup=True)):
+            result = model.get_probabilities(data['name'], data['zcta5'])
+            pd.testing.assert_frame_equal(result, true_result)
+
+    def test_compact(self):
+        """Test compact results hold the largest of the full probabilities"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        model = SurgeoModel(compact=True, margin=True)
+        result = model.get_probabilities(data['name'], data['zcta5'])
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        probs = true_result.iloc[:, 2:]
+        self.assertEqual(
+            list(result.columns),
+            ['zcta5', 'name', 'race', 'probability', 'margin'],
+        )
+        self.assertEqual(list(result['race'].cat.categories), list(probs.columns))
+        self.assertTrue((result.dtypes[['probability', 'margin']] == np.float32).all())
+        # Rows without any probabilities have no race
+        found = probs.notna().any(axis=1)
+        pd.testing.assert_series_equal(
+            result.loc[found, 'race'].astype(str),
+            probs[found].idxmax(axis=1).astype(str),
+            check_names=False,
+        )
+        self.assertTrue(result.loc[~found, 'race'].isna().all())
+        top_two = np.sort(probs.fillna(0).to_numpy(), axis=1)[:, -2:]
+        np.testing.assert_allclose(
+            result['probability'].where(found, 0),
+            top_two[:, 1],
+            atol=1e-6,
+        )
+        np.testing.assert_allclose(
+            result['margin'].where(found, 0),
+            top_two[:, 1] - top_two[:, 0],
+            atol=1e-6,
+        )
+        # Single records give the same compact values
+        record = model.score_one(data['name'][0], data['zcta5'][0])
+        pd.testing.assert_series_equal(
+            pd.Series(record, name=0, dtype=object),
+            result.iloc[0].astype(object),
+        )
+
+    def test_lazy_loading(self):
+        """Test tables are only loaded on first use or by load()"""
+        model = SurgeoModel()
+        self.assertFalse(model.is_loaded())
+        self.assertNotIn('_PROB_GEO_GIVEN_RACE', vars(model))
+        self.assertIs(model.load(), model)
+        self.assertTrue(model.is_loaded())
+
+    def test_score_one(self):
+        """Test single record scoring matches the batch results"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        for i, row in data.iterrows():
+            result = self._SURGEO_MODEL.score_one(row['name'], row['zcta5'])
+            pd.testing.assert_series_equal(
+                pd.Series(result, name=i, dtype=object),
+                true_result.iloc[i].astype(object),
+            )
+        # Tracts are given as a (state, county, tract) tuple
+        tracts = pd.read_csv(self._DATA_FOLDER / 'tract_input.csv', dtype=str)
+        true_result = self._SURGEO_MODEL_TRACT.get_probabilities(
+            tracts['name'],
+            tracts[['state', 'county', 'tract']],
+        )
+        result = self._SURGEO_MODEL_TRACT.score_one(
+            tracts['name'][0],
+            tuple(tracts.loc[0, ['state', 'county', 'tract']]),
+        )
+        pd.testing.assert_series_equal(
+            pd.Series(result, name=0, dtype=object),
+            true_result.iloc[0].astype(object),
+        )
+
+    def test_float32(self):
+        """Test float32 results stay within 1e-6 of float64 results"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        model = SurgeoModel(dtype=np.float32)
+        result = model.get_probabilities(data['name'], data['zcta5'])
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        race_columns = result.columns[2:]
+        self.assertTrue((result.dtypes[race_columns] == np.float32).all())
+        pd.testing.assert_frame_equal(
+            result,
+            true_result.astype({col: np.float32 for col in race_columns}),
+            atol=1e-6,
+        )
+        with self.assertRaises(SurgeoException):
+            SurgeoModel(dtype=np.int64)
+
+    def test_output_buffer(self):
+        """Test the surname copy is the output and the inputs are unchanged"""
+        race_columns = self._SURGEO_MODEL._PROB_RACE_GIVEN_SURNAME.columns
+        sur_probs = pd.DataFrame(
+            np.full((3, len(race_columns)), 0.5),
+            columns=race_columns,
+        )
+        geo_probs = sur_probs * 2
+        original = sur_probs.copy()
+        posterior = self._SURGEO_MODEL._posterior
+        calls = []
+
+        def record_posterior(*factors, out=None):
+            calls.append((factors[0], out))
+            return posterior(*factors, out=out)
+
+        with unittest.mock.patch.object(
+                self._SURGEO_MODEL,
+                '_posterior',
+                record_posterior):
+            result = self._SURGEO_MODEL._combined_probs(sur_probs, geo_probs)
+        first_factor, out = calls[0]
+        self.assertIs(out, first_factor)
+        self.assertFalse(np.shares_memory(out, sur_probs.to_numpy()))
+        pd.testing.assert_frame_equal(sur_probs, original)
+        np.testing.assert_allclose(
+            result[race_columns].to_numpy(),
+            1 / len(race_columns),
+        )
+
 if __name__ == '__main__':
     unittest.main()
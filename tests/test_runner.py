@@ -6,24 +6,38 @@ from surgeo import models
 
 # Import test modules
 import app.test_cli
+import app.test_daemon
 import app.test_gui
+import app.test_server
 import models.test_base_model
 import models.test_bifsg_model
 import models.test_first_name_model
 import models.test_geocode_model
 import models.test_surgeo_model
 import models.test_surname_model
+import utility.test_async_scorer
+import utility.test_columnar_io
+import utility.test_csv_io
+import utility.test_excel_io
+import utility.test_micro_batcher
 
 # List test modules
 test_modules = [
     app.test_cli,
+    app.test_daemon,
     app.test_gui,
+    app.test_server,
     models.test_base_model,
     models.test_bifsg_model,
     models.test_first_name_model,
     models.test_geocode_model,
     models.test_surgeo_model,
     models.test_surname_model,
+    utility.test_async_scorer,
+    utility.test_columnar_io,
+    utility.test_csv_io,
+    utility.test_excel_io,
+    utility.test_micro_batcher,
 ]
 
 # Create loader and suite
@@ -0,0 +1,82 @@
+import asyncio
+import pathlib
+import threading
+import unittest
+
+import pandas as pd
+
+from surgeo.models.surgeo_model import SurgeoModel
+from surgeo.utility.async_scorer import AsyncScorer
+
+
+class TestAsyncScorer(unittest.TestCase):
+
+    _SURGEO_MODEL = SurgeoModel()
+
+    _DATA_FOLDER = pathlib.Path(__file__).resolve().parents[1] / 'data'
+
+    def test_score(self):
+        """Test chunked results match a single get_probabilities() call"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        data = pd.concat([data] * 8, ignore_index=True)
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        scorer = AsyncScorer(
+            self._SURGEO_MODEL.get_probabilities,
+            max_concurrency=2,
+            chunksize=7,
+        )
+        result = asyncio.run(scorer.score(data['name'], data['zcta5']))
+        pd.testing.assert_frame_equal(result, true_result)
+
+    def test_index(self):
+        """Test results keep the input index whether or not it is chunked"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        data.index = range(100, 100 + 2 * len(data), 2)
+        true_result.index = data.index
+        for chunksize in (len(data), 3):
+            scorer = AsyncScorer(
+                self._SURGEO_MODEL.get_probabilities,
+                chunksize=chunksize,
+            )
+            result = asyncio.run(scorer.score(data['name'], data['zcta5']))
+            pd.testing.assert_frame_equal(result, true_result)
+
+    def test_cancel(self):
+        """Test cancelling a call stops chunks that have not started"""
+        started = []
+        release = threading.Event()
+
+        def score_function(names):
+            started.append(len(names))
+            release.wait()
+            return pd.DataFrame({'name': names}).reset_index(drop=True)
+
+        async def run():
+            scorer = AsyncScorer(score_function, max_concurrency=1, chunksize=2)
+            task = asyncio.create_task(scorer.score(pd.Series(range(10))))
+            while not started:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        self.assertEqual(started, [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from surgeo.utility.columnar_io import ColumnarWriter
+from surgeo.utility.columnar_io import iter_columnar
+from surgeo.utility.columnar_io import read_columnar
+
+
+@unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'needs pyarrow')
+class TestColumnarIO(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Test pieces written to each format read back whole and in batches"""
+        df = pd.DataFrame({
+            'name': ['DIAZ', None, 'SMITH', 'JONES', 'LEE'],
+            'white': [0.1, np.nan, 0.5, 0.7, 0.2],
+        })
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for suffix in ('.parquet', '.feather', '.arrow'):
+                path = pathlib.Path(temp_dir, 'data' + suffix)
+                with ColumnarWriter(path) as writer:
+                    writer.write(df.iloc[:3])
+                    # A piece with only missing names keeps the string type
+                    writer.write(df.iloc[3:].assign(name=None))
+                true_df = df.assign(name=['DIAZ', None, 'SMITH', None, None])
+                result = read_columnar(path)
+                pd.testing.assert_frame_equal(
+                    result,
+                    true_df,
+                    check_dtype=False,
+                )
+                self.assertEqual(result['white'].dtype, np.float64)
+                result = read_columnar(path, ['white'])
+                self.assertEqual(list(result.columns), ['white'])
+                batches = list(iter_columnar(path, 2, ['white']))
+                self.assertLessEqual(max(len(batch) for batch in batches), 2)
+                pd.testing.assert_frame_equal(
+                    pd.concat(batches, ignore_index=True),
+                    true_df[['white']],
+                )
+
+    def test_errors(self):
+        """Test invalid files and missing columns are raised up front"""
+        df = pd.DataFrame({'name': ['DIAZ'], 'white': [0.1]})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for suffix in ('.parquet', '.feather', '.arrow'):
+                path = pathlib.Path(temp_dir, 'data' + suffix)
+                with ColumnarWriter(path) as writer:
+                    writer.write(df)
+                with self.assertRaisesRegex(ValueError, 'zcta5'):
+                    iter_columnar(path, 2, ['name', 'zcta5'])
+                path.write_bytes(b'not a columnar file')
+                with self.assertRaises(ValueError):
+                    iter_columnar(path, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from surgeo.utility.csv_io import CSVWriter
+from surgeo.utility.csv_io import is_csv
+
+
+class TestCSVIO(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Test pieces written to each compression read back whole"""
+        df = pd.DataFrame({
+            'name': ['DIAZ', None, 'SMITH', 'JONES', 'LEE'],
+            'white': [0.1, np.nan, 0.5, 0.7, 0.2],
+        })
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for suffix in ('.csv', '.csv.gz', '.csv.bz2', '.csv.xz'):
+                path = pathlib.Path(temp_dir, 'data' + suffix)
+                self.assertTrue(is_csv(path))
+                with CSVWriter(path) as writer:
+                    writer.write(df.iloc[:3])
+                    writer.write(df.iloc[3:])
+                pd.testing.assert_frame_equal(
+                    pd.read_csv(path),
+                    df,
+                    check_dtype=False,
+                )
+        self.assertFalse(is_csv('data.gz'))
+
+    def test_utf8(self):
+        """Test non-ASCII names are written as UTF-8 under an ASCII locale"""
+        # Turn off UTF-8 mode and C locale coercion so ASCII is the default
+        env = dict(
+            os.environ,
+            LC_ALL='C',
+            PYTHONCOERCECLOCALE='0',
+            PYTHONUTF8='0',
+        )
+        script = (
+            'import sys\n'
+            'import pandas as pd\n'
+            'from surgeo.utility.csv_io import write_csv\n'
+            'for path in sys.argv[1:]:\n'
+            '    write_csv(path, pd.DataFrame({"name": ["JOS\\u00c9"]}))\n'
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = [
+                pathlib.Path(temp_dir, 'data' + suffix)
+                for suffix in ('.csv', '.csv.gz')
+            ]
+            subprocess.run(
+                [sys.executable, '-c', script, *map(str, paths)],
+                env=env,
+                check=True,
+            )
+            for path in paths:
+                self.assertEqual(
+                    pd.read_csv(path, encoding='utf-8')['name'][0],
+                    'JOSÉ',
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
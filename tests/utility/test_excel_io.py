@@ -0,0 +1,65 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from surgeo.utility.excel_io import ExcelWriter
+from surgeo.utility.excel_io import iter_excel
+from surgeo.utility.excel_io import read_excel
+
+
+class TestExcelIO(unittest.TestCase):
+
+    def test_read(self):
+        """Test a sheet reads like pd.read_excel(..., dtype=str)"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir, 'input.xlsx')
+            workbook = openpyxl.Workbook()
+            sheet = workbook.active
+            sheet.append(['name', 'zcta', 'white'])
+            sheet.append(['DIAZ', 631, 0.5])
+            sheet.append([None, None, None])
+            sheet.append(['LEE', None, 2.0])
+            sheet.append([None, None, None])
+            workbook.save(path)
+            true_df = pd.read_excel(path, engine='openpyxl', dtype=str)
+            pd.testing.assert_frame_equal(read_excel(path), true_df)
+            result = read_excel(path, ['zcta', 'name'])
+            self.assertEqual(list(result.columns), ['name', 'zcta'])
+            # Missing columns are skipped by a function but not by a list
+            result = read_excel(path, {'zcta', 'nope'}.__contains__)
+            self.assertEqual(list(result.columns), ['zcta'])
+            with self.assertRaises(ValueError):
+                iter_excel(path, 2, ['zcta', 'nope'])
+            batches = list(iter_excel(path, 2, ['white']))
+            self.assertEqual([len(batch) for batch in batches], [2, 1])
+            pd.testing.assert_frame_equal(
+                pd.concat(batches, ignore_index=True),
+                true_df[['white']],
+            )
+
+    def test_write(self):
+        """Test rows past the sheet limit continue on new sheets"""
+        df = pd.DataFrame({
+            'name': ['DIAZ', None, 'SMITH', 'JONES', 'LEE'],
+            'white': [0.1, 0.3, np.nan, 0.7, 0.2],
+        })
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = pathlib.Path(temp_dir, 'output.xlsx')
+            with ExcelWriter(path, max_rows=3) as writer:
+                writer.write(df.iloc[:3])
+                writer.write(df.iloc[3:])
+            sheets = pd.read_excel(path, engine='openpyxl', sheet_name=None)
+            self.assertEqual(list(sheets), ['Sheet1', 'Sheet2', 'Sheet3'])
+            pd.testing.assert_frame_equal(
+                pd.concat(sheets.values(), ignore_index=True),
+                df,
+                check_dtype=False,
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import pathlib
+import unittest
+
+import pandas as pd
+
+from surgeo.models.surgeo_model import SurgeoModel
+from surgeo.utility.micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    _SURGEO_MODEL = SurgeoModel()
+
+    _DATA_FOLDER = pathlib.Path(__file__).resolve().parents[1] / 'data'
+
+    def test_score(self):
+        """Test concurrent requests are batched and get their own rows"""
+        data = pd.read_csv(
+            self._DATA_FOLDER / 'surgeo_input.csv',
+            skip_blank_lines=False,
+        )
+        data = pd.concat([data] * 8, ignore_index=True)
+        true_result = self._SURGEO_MODEL.get_probabilities(
+            data['name'],
+            data['zcta5'],
+        )
+        batcher = MicroBatcher(
+            self._SURGEO_MODEL.get_probabilities,
+            max_batch_size=len(data),
+            max_latency_ms=1000,
+        )
+        with batcher:
+            # One row per request, all submitted before the first is scored
+            futures = [
+                batcher.submit(data['name'][i:i + 1], data['zcta5'][i:i + 1])
+                for i in range(len(data))
+            ]
+            results = [future.result() for future in futures]
+        self.assertEqual(batcher.batch_count, 1)
+        self.assertEqual(batcher.record_count, len(data))
+        pd.testing.assert_frame_equal(
+            pd.concat(results, ignore_index=True),
+            true_result,
+        )
+
+    def test_errors(self):
+        """Test misaligned requests are refused and others still scored"""
+        names = pd.Series(['Diaz'])
+        with MicroBatcher(self._SURGEO_MODEL.get_probabilities) as batcher:
+            good = batcher.submit(names, pd.Series(['63110']))
+            # Two misaligned requests would otherwise form an aligned batch
+            with self.assertRaises(ValueError):
+                batcher.submit(names, pd.Series(['63110', '63144']))
+            with self.assertRaises(ValueError):
+                batcher.submit(pd.Series(['Diaz', 'Smith']), pd.Series(['63110']))
+            self.assertEqual(len(good.result()), 1)
+        with self.assertRaises(RuntimeError):
+            batcher.submit(names, pd.Series(['63110']))
+
+
+if __name__ == '__main__':
+    unittest.main()